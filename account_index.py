@@ -0,0 +1,116 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+import delta_sync
+import local_store
+
+# ------------------- ACCOUNT KEY INDEX -------------------
+# Local SQLite copy of Account Id/Name used for duplicate checks.
+# Built once with a full scan, then kept current with delta queries on
+# SystemModstamp plus the getDeleted resource (see delta_sync).
+
+INDEX_FILE = "account_index.sqlite3"
+
+_sync_lock = threading.Lock()
+
+
+def name_key(name):
+    """Normalized Account name used as the duplicate key"""
+    return (name or "").strip().lower()
+
+
+def _connect(sf):
+    conn = sqlite3.connect(local_store.org_path(sf, INDEX_FILE), timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS accounts (id TEXT PRIMARY KEY, name TEXT, name_key TEXT)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_accounts_name_key ON accounts (name_key)")
+    conn.execute("CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)")
+    return conn
+
+
+def _get_state(conn, key):
+    row = conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+    return datetime.fromisoformat(row[0]) if row else None
+
+
+def _set_state(conn, key, value):
+    conn.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, value.isoformat()))
+
+
+def sync_account_index(sf, rebuild=False):
+    """Bring the local index up to date, returns a summary of what changed"""
+    with _sync_lock:
+        conn = _connect(sf)
+        try:
+            result = delta_sync.sync(
+                sf, "Account", "SELECT Id, Name, SystemModstamp FROM Account",
+                _get_state(conn, "last_sync"), _get_state(conn, "last_modstamp"),
+                clear=lambda: conn.execute("DELETE FROM accounts"),
+                write=lambda records: delta_sync.write_records(
+                    conn, "INSERT OR REPLACE INTO accounts (id, name, name_key) VALUES (?, ?, ?)", records,
+                    lambda r: (r["Id"], r.get("Name") or "", name_key(r.get("Name")))),
+                delete=lambda ids: conn.executemany("DELETE FROM accounts WHERE id = ?", [(i,) for i in ids]),
+                rebuild=rebuild)
+            if result["last_modstamp"] is not None:
+                _set_state(conn, "last_modstamp", result["last_modstamp"])
+            _set_state(conn, "last_sync", result["last_sync"])
+            conn.commit()
+            total = conn.execute("SELECT COUNT(*) FROM accounts").fetchone()[0]
+            return {"mode": result["mode"], "upserted": result["upserted"], "deleted": result["deleted"],
+                    "total": total}
+        finally:
+            conn.close()
+
+
+def existing_name_keys(sf, keys):
+    """Return the subset of `keys` (normalized names) already present in the index"""
+    conn = _connect(sf)
+    try:
+        conn.execute("CREATE TEMP TABLE probe (k TEXT)")
+        conn.executemany("INSERT INTO probe (k) VALUES (?)", ((k,) for k in set(keys) if isinstance(k, str)))
+        rows = conn.execute(
+            "SELECT DISTINCT p.k FROM probe p JOIN accounts a ON a.name_key = p.k"
+        ).fetchall()
+        return {r[0] for r in rows}
+    finally:
+        conn.close()
+
+
+def all_names(sf):
+    """Every indexed Account as (Id, Name)"""
+    conn = _connect(sf)
+    try:
+        return conn.execute("SELECT id, name FROM accounts").fetchall()
+    finally:
+        conn.close()
+
+
+def is_built(sf):
+    """True if the index exists and a delta sync (rather than a full rebuild) can bring it up to date"""
+    if not os.path.exists(local_store.org_path(sf, INDEX_FILE)):
+        return False
+    conn = _connect(sf)
+    try:
+        return delta_sync.can_delta(_get_state(conn, "last_sync"))
+    finally:
+        conn.close()
+
+
+def prefix_matches(sf, prefix, limit):
+    """Accounts whose normalized name starts with `prefix` as (Id, Name), or None if no index was built yet"""
+    if not os.path.exists(local_store.org_path(sf, INDEX_FILE)):
+        return None
+    conn = _connect(sf)
+    try:
+        if _get_state(conn, "last_sync") is None:
+            return None
+        key = name_key(prefix)
+        rows = conn.execute(
+            "SELECT id, name FROM accounts WHERE name_key >= ? AND name_key < ? ORDER BY name_key LIMIT ?",
+            (key, key + "\uffff", limit),
+        ).fetchall()
+        return [(r[0], r[1]) for r in rows]
+    finally:
+        conn.close()
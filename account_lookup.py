@@ -0,0 +1,123 @@
+import bisect
+import re
+import threading
+import time
+from itertools import islice
+
+import account_index
+import pagination
+
+# ------------------- ACCOUNT LOOKUP SERVICE -------------------
+# Shared type-ahead lookup of parent Accounts for the Contact and
+# Opportunity forms. Id/Name pairs seen so far are kept per org in memory
+# with a sorted name list (prefix search) and a word index (matches on any
+# word of the name). A prefix that is not known to be complete is answered
+# from the local Account index when it has been built, otherwise with one
+# targeted `Name LIKE 'x%'` query. An org's cache starts over once it
+# holds MAX_NAMES Accounts, so a long-running process does not keep every
+# Account anyone ever looked up.
+
+FETCH_LIMIT = 200
+RESULT_LIMIT = 25
+PREFIX_TTL = 600
+MAX_NAMES = 50_000
+
+_lock = threading.Lock()
+_orgs = {}
+
+
+def _norm(text):
+    return (text or "").strip().lower()
+
+
+def _tokens(name):
+    return [t for t in re.split(r"[^0-9a-z]+", _norm(name)) if t]
+
+
+def _state(sf, adding=0):
+    """Cached Accounts of the org; emptied first if `adding` more would take it past MAX_NAMES"""
+    state = _orgs.get(sf.sf_instance)
+    if state is None or len(state["names"]) + adding > MAX_NAMES:
+        state = _orgs[sf.sf_instance] = {"names": {}, "sorted": [], "tokens": {}, "token_keys": [],
+                                         "complete": {}}
+    return state
+
+
+def _add(state, rows):
+    for account_id, name in rows:
+        if not account_id or state["names"].get(account_id) == name:
+            continue
+        old = state["names"].get(account_id)
+        if old is not None:
+            state["sorted"].remove((_norm(old), account_id))
+            for t in _tokens(old):
+                state["tokens"].get(t, set()).discard(account_id)
+        state["names"][account_id] = name or ""
+        bisect.insort(state["sorted"], (_norm(name), account_id))
+        for t in _tokens(name):
+            if t not in state["tokens"]:
+                state["tokens"][t] = set()
+                bisect.insort(state["token_keys"], t)
+            state["tokens"][t].add(account_id)
+
+
+def _is_complete(state, key):
+    """True if every Account starting with `key` is already cached (a shorter prefix counts too)"""
+    now = time.monotonic()
+    return any(state["complete"].get(key[:n], 0) > now for n in range(1, len(key) + 1))
+
+
+def _local_matches(state, key, limit):
+    start = bisect.bisect_left(state["sorted"], (key, ""))
+    ids = {}
+    for name_key, account_id in islice(state["sorted"], start, None):
+        if not name_key.startswith(key) or len(ids) >= limit:
+            break
+        ids[account_id] = None
+    # Then names where a later word starts with the typed text
+    start = bisect.bisect_left(state["token_keys"], key)
+    for token in islice(state["token_keys"], start, None):
+        if not token.startswith(key) or len(ids) >= limit:
+            break
+        for account_id in state["tokens"][token]:
+            ids.setdefault(account_id)
+            if len(ids) >= limit:
+                break
+    return [(i, state["names"][i]) for i in ids]
+
+
+def search(sf, text, limit=RESULT_LIMIT):
+    """Accounts matching the typed text as a list of (Id, Name)"""
+    key = _norm(text)
+    if not key:
+        return []
+    with _lock:
+        state = _state(sf)
+        if _is_complete(state, key):
+            return _local_matches(state, key, limit)
+
+    rows = account_index.prefix_matches(sf, key, FETCH_LIMIT)
+    if rows is None:
+        query = (f"SELECT Id, Name FROM Account WHERE Name LIKE '{pagination.soql_escape(key)}%' "
+                 f"ORDER BY Name LIMIT {FETCH_LIMIT}")
+        rows = [(r["Id"], r["Name"]) for r in sf.query(query)["records"]]
+
+    with _lock:
+        state = _state(sf, adding=len(rows))
+        _add(state, rows)
+        if len(rows) < FETCH_LIMIT:
+            now = time.monotonic()
+            state["complete"] = {k: t for k, t in state["complete"].items() if t > now}
+            state["complete"][key] = now + PREFIX_TTL
+        return _local_matches(state, key, limit)
+
+
+def options(sf, text, current_id=None, current_name=""):
+    """Picker options: the currently linked Account first, then matches for the typed text"""
+    with _lock:
+        if current_id and current_name:
+            _add(_state(sf, adding=1), [(current_id, current_name)])
+    found = search(sf, text) if text else []
+    if current_id:
+        found = [(current_id, current_name)] + [row for row in found if row[0] != current_id]
+    return found
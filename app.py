@@ -1,9 +1,6 @@
 import streamlit as st
-from simple_salesforce import Salesforce, SalesforceAuthenticationFailed
-import account
-import contact
-import opportunity
-import lead
+import search_cache
+import object_registry
 
 # -------- Page Config --------
 st.set_page_config(
@@ -62,8 +59,11 @@ if not st.session_state.logged_in:
             st.error("⚠️ All fields are required.")
         else:
             st.success("🔄 Verifying your credentials, please wait...")  # green success message
+            # simple_salesforce is only needed once someone actually logs in
+            import sf_session
+            from simple_salesforce import SalesforceAuthenticationFailed
             try:
-                sf = Salesforce(username=userid, password=password, security_token=securitytoken)
+                sf = sf_session.get_connection(userid, password, securitytoken)
                 st.session_state.sf_connection = sf
                 st.session_state.logged_in = True
                 st.session_state.userid = userid
@@ -102,6 +102,7 @@ else:
         st.markdown("#### 📊 Manage Records")
         st.markdown(
             """
+            - 🔎 **Search All Objects**  
             - 🏢 **Accounts**  
             - 👥 **Contacts**  
             - 💼 **Opportunities**  
@@ -110,6 +111,48 @@ else:
         )
         st.caption("💡 Tip: Use the main panel to search, add, or update Salesforce records.")
 
+        import sf_session
+        pool = sf_session.pool_stats()
+        st.caption(
+            f"🔌 Session pool: {pool['hit_rate']:.0%} reused "
+            f"({pool['hits'] + pool['restored']} reused, {pool['logins']} logins, {pool['refreshes']} refreshed)"
+        )
+        cache = search_cache.cache_stats()
+        st.caption(
+            f"🗄️ Search cache: {cache['hit_rate']:.0%} hits "
+            f"({cache['hits']} hits, {cache['misses']} misses, {cache['coalesced']} shared an in-flight query, "
+            f"{cache['abandoned']} abandoned, {cache['entries']} cached)"
+        )
+        import describe_cache
+        meta = describe_cache.cache_stats()
+        st.caption(
+            f"📋 Field metadata: {meta['no_call_rate']:.0%} served without a call "
+            f"({meta['memory'] + meta['disk']} cached, {meta['not_modified']} revalidated, {meta['fetched']} fetched)"
+        )
+        import update_stats
+        writes = update_stats.update_stats()
+        if writes["updates"] or writes["skipped"]:
+            st.caption(
+                f"✏️ Record updates: {writes['skipped']} calls skipped (nothing changed), "
+                f"{writes['fields_unchanged']} unchanged fields not sent ({writes['bytes_saved'] / 1024:.1f} KB)"
+            )
+        import local_replica
+        if local_replica.ENABLED:
+            replicated = []
+            for obj, entry in local_replica.status(st.session_state.sf_connection).items():
+                state = "" if local_replica.is_fresh(st.session_state.sf_connection, obj) else " (syncing)"
+                if entry.get("error"):
+                    state = f" (⚠️ {entry['error']})"
+                replicated.append(f"{obj} {entry['rows']:,} rows{state}")
+            st.caption("🗃️ Local replica: " + (", ".join(replicated) or "first sync running"))
+        import upload_jobs
+        running = upload_jobs.running_count((st.session_state.sf_connection.sf_instance, st.session_state.userid))
+        if running:
+            st.caption(f"⏳ Bulk uploads running in the background: {running}")
+        loaded = object_registry.load_times()
+        if loaded:
+            st.caption("⏱️ Modules loaded: " + ", ".join(f"{name} {secs:.2f}s" for name, secs in loaded.items()))
+
         if st.sidebar.button("🚪 Logout"):
             st.session_state.logged_in = False
             st.session_state.sf_connection = None
@@ -173,7 +216,7 @@ else:
 
     choice = st.selectbox(
         "Select Salesforce Object:",
-        ["--Select Option--", "Account", "Contact", "Opportunity", "Lead"],
+        ["--Select Option--"] + object_registry.labels(),
         index=0,
         key="object_choice"
     )
@@ -181,23 +224,9 @@ else:
     #st.divider()
 
     # ---------- OBJECT MODULES ----------
-    if choice == "Account":
-        try:
-            account.run()
-        except Exception as e:
-            st.error(f"❌ Failed to open Account module: {e}")
-    elif choice == "Contact":
-        try:
-            contact.run()
-        except Exception as e:
-            st.error(f"❌ Failed to open Contact module: {e}")
-    elif choice == "Opportunity":
-        try:
-            opportunity.run()
-        except Exception as e:
-            st.error(f"❌ Failed to open Opportunity module: {e}")
-    elif choice == "Lead":
+    # Imported on first selection (see object_registry)
+    if choice in object_registry.labels():
         try:
-            lead.run()
+            object_registry.run(choice)
         except Exception as e:
-            st.error(f"❌ Failed to open Lead module: {e}")
+            st.error(f"❌ Failed to open {choice} module: {e}")
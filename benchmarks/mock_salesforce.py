@@ -0,0 +1,505 @@
+import csv
+import io
+import itertools
+import json
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import parse_qs, unquote, urlparse
+
+import requests
+from requests.adapters import BaseAdapter
+from simple_salesforce import Salesforce
+
+# ------------------- MOCK SALESFORCE -------------------
+# In-process stand-in for the REST query (with GROUP BY aggregates) and SOSL search, sObject CRUD,
+# Bulk API v1 and Bulk API 2.0 ingest endpoints. It is mounted as a
+# requests transport adapter on a fake instance host, so simple_salesforce
+# and the app code run unchanged and no socket is opened. Each call sleeps for `latency` seconds (which
+# releases the GIL like real network I/O) and is counted per endpoint.
+
+INSTANCE = "bench.my.salesforce.com"
+KEY_PREFIXES = {"Account": "001", "Contact": "003", "Opportunity": "006", "Lead": "00Q"}
+
+
+# ------------------- SOQL SUBSET -------------------
+_QUERY = re.compile(
+    r"SELECT\s+(?P<fields>.+?)\s+FROM\s+(?P<object>\w+)"
+    r"(?:\s+WHERE\s+(?P<where>.+?))?(?:\s+GROUP\s+BY\s+(?P<group>.+?))?"
+    r"(?:\s+ORDER\s+BY\s+(?P<order>[\w.]+)(?:\s+(?P<dir>ASC|DESC))?)?"
+    r"(?:\s+LIMIT\s+(?P<limit>\d+))?\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+_TOKEN = re.compile(
+    r"\s*(?:(?P<lp>\()|(?P<rp>\))|(?P<str>'(?:\\.|[^'\\])*')|(?P<op>>=|<=|!=|=|>|<)"
+    r"|(?P<word>[\w.:+-]+)|(?P<comma>,))"
+)
+
+
+def _tokens(text):
+    pos = 0
+    out = []
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        if not m or m.end() == pos:
+            raise ValueError(f"Cannot parse WHERE clause near: {text[pos:pos + 20]!r}")
+        pos = m.end()
+        kind = m.lastgroup
+        value = m.group(kind)
+        if kind == "str":
+            value = re.sub(r"\\(.)", r"\1", value[1:-1])
+        out.append((kind, value))
+    return out
+
+
+_EXPRESSION = re.compile(r"(?:(?P<fn>\w+)\((?P<arg>[\w.]*)\)|(?P<field>[\w.]+))(?:\s+(?P<alias>\w+))?$")
+_DATE_PARTS = {"CALENDAR_YEAR": lambda v: int(v[:4]), "CALENDAR_MONTH": lambda v: int(v[5:7])}
+_AGGREGATES = {"COUNT": len, "SUM": sum, "AVG": lambda v: sum(v) / len(v), "MIN": min, "MAX": max}
+
+
+def _aggregate(rows, fields, group_by):
+    """AggregateResult rows of a GROUP BY query (COUNT, SUM, AVG, MIN, MAX over plain fields and
+    CALENDAR_YEAR/CALENDAR_MONTH of dates)"""
+    def value(expr, row):
+        v = row.get(expr.group("arg") or expr.group("field"))
+        return _DATE_PARTS[expr.group("fn").upper()](v) if expr.group("fn") and v else v
+
+    keys = [_EXPRESSION.match(g.strip()) for g in group_by.split(",")]
+    groups = {}
+    for row in rows:
+        groups.setdefault(tuple(value(k, row) for k in keys), []).append(row)
+    out = []
+    for members in groups.values():
+        result = {"attributes": {"type": "AggregateResult"}}
+        for n, item in enumerate(fields):
+            expr = _EXPRESSION.match(item)
+            fn = (expr.group("fn") or "").upper()
+            name = expr.group("alias") or (expr.group("field") if not fn else f"expr{n}")
+            if fn in _AGGREGATES:
+                present = [r[expr.group("arg")] for r in members if r.get(expr.group("arg")) is not None]
+                result[name] = _AGGREGATES[fn](present) if present or fn == "COUNT" else None
+            else:
+                result[name] = value(expr, members[0])
+        out.append(result)
+    return out
+
+
+def _like(pattern):
+    regex = "".join(".*" if c == "%" else "." if c == "_" else re.escape(c) for c in pattern)
+    compiled = re.compile(f"^{regex}$", re.IGNORECASE | re.DOTALL)
+    return lambda v: v is not None and compiled.match(str(v)) is not None
+
+
+def _compare(op, literal):
+    if op == "=":
+        return lambda v: v == literal
+    if op == "!=":
+        return lambda v: v != literal
+    ops = {">": lambda a, b: a > b, "<": lambda a, b: a < b, ">=": lambda a, b: a >= b, "<=": lambda a, b: a <= b}
+    return lambda v: v is not None and ops[op](v, literal)
+
+
+class _Where:
+    """Recursive-descent parser for the WHERE clauses the app sends"""
+
+    def __init__(self, text):
+        self.tokens = _tokens(text)
+        self.pos = 0
+
+    def parse(self):
+        predicate = self._or()
+        if self.pos != len(self.tokens):
+            raise ValueError(f"Unexpected token {self.tokens[self.pos][1]!r}")
+        return predicate
+
+    def _peek_word(self, word):
+        if self.pos >= len(self.tokens):
+            return False
+        kind, value = self.tokens[self.pos]
+        return kind == "word" and value.upper() == word
+
+    def _or(self):
+        parts = [self._and()]
+        while self._peek_word("OR"):
+            self.pos += 1
+            parts.append(self._and())
+        return parts[0] if len(parts) == 1 else (lambda r: any(p(r) for p in parts))
+
+    def _and(self):
+        parts = [self._atom()]
+        while self._peek_word("AND"):
+            self.pos += 1
+            parts.append(self._atom())
+        return parts[0] if len(parts) == 1 else (lambda r: all(p(r) for p in parts))
+
+    def _atom(self):
+        kind, value = self.tokens[self.pos]
+        if kind == "lp":
+            self.pos += 1
+            inner = self._or()
+            self.pos += 1
+            return inner
+        field = value
+        self.pos += 1
+        kind, op = self.tokens[self.pos]
+        self.pos += 1
+        if kind == "word" and op.upper() == "LIKE":
+            test = _like(self.tokens[self.pos][1])
+            self.pos += 1
+        elif kind == "word" and op.upper() == "IN":
+            self.pos += 1
+            values = set()
+            while self.tokens[self.pos][0] != "rp":
+                if self.tokens[self.pos][0] != "comma":
+                    values.add(self.tokens[self.pos][1].lower())
+                self.pos += 1
+            self.pos += 1
+            # Text comparisons in SOQL are case-insensitive
+            test = lambda v, values=values: v is not None and str(v).lower() in values
+        else:
+            kind, literal = self.tokens[self.pos]
+            self.pos += 1
+            if kind == "word" and literal.lower() == "null":
+                test = (lambda v: v in (None, "")) if op == "=" else (lambda v: v not in (None, ""))
+            elif field == "SystemModstamp":
+                literal = literal[:19]
+                base = _compare(op, literal)
+                test = lambda v, base=base: v is not None and base(v[:19])
+            else:
+                test = _compare(op, literal)
+        return lambda r: test(r.get(field))
+
+
+# ------------------- SOSL SUBSET -------------------
+_FIND = re.compile(r"FIND\s+\{(?P<term>(?:\\.|[^}\\])*)\}\s+IN\s+ALL\s+FIELDS\s+RETURNING\s+(?P<returning>.+)$",
+                   re.IGNORECASE | re.DOTALL)
+_RETURNING = re.compile(r"(?P<object>\w+)\((?P<fields>[^)]*?)(?:\s+LIMIT\s+(?P<limit>\d+))?\)", re.IGNORECASE)
+
+
+def _search_words(term):
+    """Words of a FIND term (escapes and trailing wildcards removed), lowercased"""
+    return [w.rstrip("*").lower() for w in re.sub(r"\\(.)", r"\1", term).split() if w.rstrip("*")]
+
+
+def _word_match(record, words):
+    """Every word starts a word of some text field, like the search index's prefix matching"""
+    text = " ".join(str(v) for k, v in record.items() if isinstance(v, str) and not k.startswith("__")).lower()
+    tokens = re.findall(r"[\w@.]+", text)
+    return all(any(t.startswith(w) for t in tokens) for w in words)
+
+
+def _select(record, fields, store):
+    row = {"attributes": {"type": record["__type__"]}}
+    for field in fields:
+        if "." in field:
+            rel, sub = field.split(".", 1)
+            parent = store.get(record.get(f"{rel}Id"))
+            if parent is None:
+                row[rel] = None
+            else:
+                row.setdefault(rel, {"attributes": {"type": rel}})[sub] = parent.get(sub)
+        else:
+            row[field] = record.get(field)
+    return row
+
+
+# ------------------- TRANSPORT ADAPTER -------------------
+class MockSalesforce(BaseAdapter):
+    """requests adapter answering Salesforce API calls from an in-memory record store"""
+
+    def __init__(self, latency=0.0, page_size=2000):
+        super().__init__()
+        self.latency = latency
+        self.page_size = page_size
+        self.records = {}          # id -> record (with "__type__")
+        self.by_object = {}        # object -> list of ids, in insertion (= Id) order
+        self.calls = Counter()
+        self.job_times = []        # seconds from job creation to close, per bulk job
+        self.describes = {}        # object -> (describe dict, last modified datetime)
+        self._cursors = {}
+        self._jobs = {}
+        self._ingest = {}
+        self._ids = Counter()
+        self._lock = threading.Lock()
+        self._seq = itertools.count(1)
+
+    # --- data ---
+    def _new_id(self, object_name):
+        self._ids[object_name] += 1
+        return f"{KEY_PREFIXES.get(object_name, 'a00')}{self._ids[object_name]:015d}"
+
+    def add(self, object_name, rows):
+        """Seed records without going through the API"""
+        stamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000+0000")
+        with self._lock:
+            ids = self.by_object.setdefault(object_name, [])
+            for row in rows:
+                record = dict(row, __type__=object_name, SystemModstamp=stamp)
+                record["Id"] = self._new_id(object_name)
+                self.records[record["Id"]] = record
+                ids.append(record["Id"])
+
+    def set_describe(self, object_name, describe):
+        """Serve `describe` for the object, marked as modified now"""
+        self.describes[object_name] = (describe, datetime.now(timezone.utc).replace(microsecond=0))
+
+    def count(self, object_name):
+        return len(self.by_object.get(object_name, []))
+
+    # --- endpoints ---
+    def _query(self, soql):
+        m = _QUERY.match(" ".join(soql.split()))
+        if not m:
+            raise ValueError(f"Unsupported SOQL: {soql}")
+        object_name = m.group("object")
+        predicate = _Where(m.group("where")).parse() if m.group("where") else None
+        with self._lock:
+            ids = list(self.by_object.get(object_name, []))
+        rows = (self.records[i] for i in ids)
+        if predicate:
+            rows = (r for r in rows if predicate(r))
+        fields = [" ".join(f.split()) for f in m.group("fields").split(",")]
+        if fields == ["COUNT()"]:
+            return {"totalSize": sum(1 for _ in rows), "done": True, "records": []}
+        if m.group("group"):
+            return self._page(_aggregate(rows, fields, m.group("group")), 0)
+        rows = list(rows)
+        if m.group("order") and m.group("order") != "Id":
+            key = m.group("order")
+            rows.sort(key=lambda r: (r.get(key) is None, str(r.get(key) or "").lower()))
+        if m.group("dir") and m.group("dir").upper() == "DESC":
+            rows.reverse()
+        if m.group("limit"):
+            rows = rows[:int(m.group("limit"))]
+        selected = [_select(r, fields, self.records) for r in rows]
+        return self._page(selected, 0)
+
+    def _search(self, sosl):
+        m = _FIND.match(" ".join(sosl.split()))
+        if not m:
+            raise ValueError(f"Unsupported SOSL: {sosl}")
+        words = _search_words(m.group("term"))
+        found = []
+        for part in _RETURNING.finditer(m.group("returning")):
+            with self._lock:
+                ids = list(self.by_object.get(part.group("object"), []))
+            fields = [f.strip() for f in part.group("fields").split(",")]
+            limit = int(part.group("limit") or 2000)
+            matched = (self.records[i] for i in ids if _word_match(self.records[i], words))
+            found.extend(_select(r, fields, self.records) for r in itertools.islice(matched, limit))
+        return {"searchRecords": found}
+
+    def _page(self, selected, offset):
+        chunk = selected[offset:offset + self.page_size]
+        body = {"totalSize": len(selected), "done": offset + self.page_size >= len(selected), "records": chunk}
+        if not body["done"]:
+            cursor = f"01g{next(self._seq):012d}-{offset + self.page_size}"
+            with self._lock:
+                self._cursors[cursor] = selected
+            body["nextRecordsUrl"] = f"/services/data/v59.0/query/{cursor}"
+        return body
+
+    def _query_more(self, cursor):
+        with self._lock:
+            selected = self._cursors.pop(cursor)
+        return self._page(selected, int(cursor.rsplit("-", 1)[1]))
+
+    def _create(self, object_name, data):
+        with self._lock:
+            record = dict(data, __type__=object_name,
+                          SystemModstamp=datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000+0000"))
+            record["Id"] = self._new_id(object_name)
+            self.records[record["Id"]] = record
+            self.by_object.setdefault(object_name, []).append(record["Id"])
+        return record["Id"]
+
+    def _upsert(self, object_name, field, rows):
+        """Update the records whose `field` matches a row (ignoring case), create the rest; [(id, created)]"""
+        with self._lock:
+            by_key = {str(self.records[i].get(field)).lower(): i for i in self.by_object.get(object_name, [])
+                      if self.records[i].get(field) is not None}
+        results = []
+        for row in rows:
+            record_id = by_key.get(str(row.get(field)).lower()) if row.get(field) is not None else None
+            if record_id:
+                with self._lock:
+                    self.records[record_id].update(row)
+                results.append((record_id, False))
+            else:
+                record_id = self._create(object_name, row)
+                if row.get(field) is not None:
+                    by_key[str(row[field]).lower()] = record_id
+                results.append((record_id, True))
+        return results
+
+    def _bulk(self, method, parts, body):
+        if parts == ["job"]:
+            job = json.loads(body)
+            job_id = f"750{next(self._seq):015d}"
+            with self._lock:
+                self._jobs[job_id] = {"object": job["object"], "operation": job["operation"],
+                                      "external_id": job.get("externalIdFieldName"),
+                                      "started": time.perf_counter(), "batches": {}}
+            return 201, {"id": job_id, "state": "Open", "object": job["object"]}
+        job_id = parts[1]
+        job = self._jobs[job_id]
+        if len(parts) == 2:
+            with self._lock:
+                self.job_times.append(time.perf_counter() - job["started"])
+            return 200, {"id": job_id, "state": "Closed"}
+        if len(parts) == 3:
+            results = []
+            if job["operation"] == "upsert":
+                results = [{"success": True, "created": created, "id": record_id, "errors": []}
+                           for record_id, created in self._upsert(job["object"], job["external_id"], json.loads(body))]
+            for row in json.loads(body) if job["operation"] != "upsert" else []:
+                if job["operation"] == "insert":
+                    results.append({"success": True, "created": True, "id": self._create(job["object"], row),
+                                    "errors": []})
+                else:
+                    results.append({"success": False, "created": False, "id": None,
+                                    "errors": [{"statusCode": "FEATURE_NOT_ENABLED", "message": job["operation"]}]})
+            batch_id = f"751{next(self._seq):015d}"
+            job["batches"][batch_id] = results
+            return 201, {"id": batch_id, "jobId": job_id, "state": "Queued"}
+        batch_id = parts[3]
+        if len(parts) == 4:
+            return 200, {"id": batch_id, "jobId": job_id, "state": "Completed"}
+        return 200, job["batches"].pop(batch_id)
+
+    def _bulk2(self, method, parts, body):
+        """Bulk API 2.0 ingest: jobs are processed when their upload is marked complete"""
+        if not parts:
+            job = json.loads(body)
+            job_id = f"750{next(self._seq):015d}"
+            with self._lock:
+                self._ingest[job_id] = {"object": job["object"], "external_id": job.get("externalIdFieldName"),
+                                        "started": time.perf_counter(), "csv": "", "state": "Open", "results": {}}
+            return 200, {"id": job_id, "state": "Open", "object": job["object"]}
+        job = self._ingest[parts[0]]
+        if len(parts) == 2 and parts[1] == "batches":
+            job["csv"] += body
+            return 201, None
+        if len(parts) == 2:
+            return 200, job["results"][parts[1]]
+        if method == "PATCH":
+            rows = list(csv.DictReader(io.StringIO(job["csv"])))
+            success = io.StringIO()
+            writer = csv.DictWriter(success, ["sf__Id", "sf__Created"] + list(rows[0] if rows else []))
+            writer.writeheader()
+            records = [{k: v for k, v in row.items() if v != ""} for row in rows]
+            if job["external_id"]:
+                outcomes = self._upsert(job["object"], job["external_id"], records)
+            else:
+                outcomes = [(self._create(job["object"], record), True) for record in records]
+            for row, (record_id, created) in zip(rows, outcomes):
+                writer.writerow(dict(row, sf__Id=record_id, sf__Created=str(created).lower()))
+            job["results"] = {"successfulResults": success.getvalue(), "failedResults": "sf__Id,sf__Error\n",
+                              "unprocessedrecords": "\n"}
+            job.update(state="JobComplete", processed=len(rows), csv="")
+            with self._lock:
+                self.job_times.append(time.perf_counter() - job["started"])
+            return 200, {"id": parts[0], "state": "UploadComplete"}
+        return 200, {"id": parts[0], "state": job["state"], "numberRecordsProcessed": job.get("processed", 0),
+                     "numberRecordsFailed": 0}
+
+    def _route(self, request):
+        url = urlparse(request.url)
+        path = unquote(url.path).rstrip("/")
+        body = request.body.read() if hasattr(request.body, "read") else request.body
+        body = body.decode() if isinstance(body, bytes) else body
+
+        m = re.match(r"/services/async/[\d.]+/(.+)$", path)
+        if m:
+            parts = m.group(1).split("/")
+            self.calls["bulk." + ("job" if len(parts) <= 2 else "batch" if len(parts) == 3
+                                  else "status" if len(parts) == 4 else "result")] += 1
+            return self._bulk(request.method, parts, body)
+
+        m = re.match(r"/services/data/v[\d.]+/jobs/ingest((?:/\w+)*)$", path)
+        if m:
+            parts = [p for p in m.group(1).split("/") if p]
+            self.calls["bulk2." + ("job" if not parts else "upload" if parts[-1] == "batches"
+                                   else "result" if len(parts) == 2 else request.method.lower())] += 1
+            return self._bulk2(request.method, parts, body)
+
+        m = re.match(r"/services/data/v[\d.]+/(query|queryAll)(?:/(.+))?$", path)
+        if m:
+            if m.group(2):
+                self.calls["query.more"] += 1
+                return 200, self._query_more(m.group(2))
+            self.calls["query"] += 1
+            return 200, self._query(parse_qs(url.query)["q"][0])
+
+        if re.match(r"/services/data/v[\d.]+/search$", path):
+            self.calls["search"] += 1
+            return 200, self._search(parse_qs(url.query)["q"][0])
+
+        m = re.match(r"/services/data/v[\d.]+/sobjects/(\w+)/deleted$", path)
+        if m:
+            self.calls["deleted"] += 1
+            return 200, {"deletedRecords": [], "earliestDateAvailable": None, "latestDateCovered": None}
+
+        m = re.match(r"/services/data/v[\d.]+/sobjects/(\w+)/describe$", path)
+        if m and m.group(1) in self.describes:
+            self.calls["describe"] += 1
+            describe, modified = self.describes[m.group(1)]
+            since = request.headers.get("If-Modified-Since")
+            if since and parsedate_to_datetime(since) >= modified:
+                return 304, None
+            return 200, describe
+
+        m = re.match(r"/services/data/v[\d.]+/sobjects/(\w+)(?:/(\w+))?$", path)
+        if m:
+            object_name, record_id = m.groups()
+            self.calls[f"sobject.{request.method.lower()}"] += 1
+            if request.method == "POST":
+                return 201, {"id": self._create(object_name, json.loads(body)), "success": True, "errors": []}
+            with self._lock:
+                record = self.records.get(record_id)
+                if record is None:
+                    return 404, [{"errorCode": "NOT_FOUND", "message": "The requested resource does not exist"}]
+                if request.method == "PATCH":
+                    record.update(json.loads(body))
+                    return 204, None
+                if request.method == "DELETE":
+                    del self.records[record_id]
+                    self.by_object[object_name].remove(record_id)
+                    return 204, None
+            return 200, {k: v for k, v in record.items() if k != "__type__"}
+
+        return 404, [{"errorCode": "NOT_FOUND", "message": f"No mock route for {path}"}]
+
+    def send(self, request, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        try:
+            status, payload = self._route(request)
+        except Exception as e:
+            status, payload = 400, [{"errorCode": "MALFORMED_QUERY", "message": str(e)}]
+        response = requests.Response()
+        response.status_code = status
+        response.url = request.url
+        response.request = request
+        response.encoding = "utf-8"
+        response._content_consumed = True
+        if isinstance(payload, str):
+            response.headers["Content-Type"] = "text/csv"
+            response._content = payload.encode()
+        else:
+            response.headers["Content-Type"] = "application/json"
+            response._content = b"" if payload is None else json.dumps(payload).encode()
+        return response
+
+    def close(self):
+        pass
+
+
+def connect(server):
+    """A simple_salesforce connection whose every call is answered by `server`"""
+    session = requests.Session()
+    session.mount(f"https://{INSTANCE}", server)
+    return Salesforce(instance=INSTANCE, session_id="00Dbench!mock", session=session)
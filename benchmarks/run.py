@@ -0,0 +1,479 @@
+"""Benchmark the app's data paths against the in-process mock Salesforce.
+
+    python -m benchmarks.run                          # every scenario at 10k, 100k and 1M records
+    python -m benchmarks.run --scales 10000 --scenarios search,account_insert --latency 0.02
+    python -m benchmarks.run --json results.json      # save results
+    python -m benchmarks.run --baseline results.json  # fail if throughput dropped by more than --tolerance
+
+Each (scenario, scale) runs in a fresh process so peak RSS is its own; the
+"(setup)" column is the peak after seeding the mock org, before the timed part.
+"""
+import argparse
+import io
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+# The app modules live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SCALES = [10_000, 100_000, 1_000_000]
+SEARCH_TERMS = ["1", "42", "777", "Acme", "zzz-no-match"]
+
+
+# ------------------- DATA GENERATION -------------------
+def _upload(df, name="upload.csv"):
+    """In-memory CSV shaped like a Streamlit UploadedFile"""
+    file = io.BytesIO(df.to_csv(index=False).encode())
+    file.name = name
+    file.size = len(file.getvalue())
+    return file
+
+
+def _accounts(start, count):
+    return pd.DataFrame({"Name": [f"Acme {i}" for i in range(start, start + count)],
+                         "Industry": "Technology", "BillingCountry": "Pakistan"})
+
+
+def _company_names(count, seed):
+    """Distinct-looking company names ("Qvoxm Ubedka Ltd") for the fuzzy matching benchmark"""
+    rng = np.random.default_rng(seed)
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    words = pd.Series(["".join(rng.choice(letters, n)) for n in rng.integers(3, 9, 20_000)]).str.title()
+    suffixes = np.array(["Inc", "Ltd", "LLC", "Corp", "Pvt Ltd", "", "", ""])
+    names = (words.iloc[rng.integers(0, len(words), count)].reset_index(drop=True) + " "
+             + words.iloc[rng.integers(0, len(words), count)].reset_index(drop=True) + " "
+             + suffixes[rng.integers(0, len(suffixes), count)])
+    return names.str.strip()
+
+
+def _contacts(start, count):
+    n = np.arange(start, start + count)
+    return pd.DataFrame({"FirstName": [f"First{i}" for i in n], "LastName": [f"Last{i}" for i in n],
+                         "Email": [f"person{i}@example.com" for i in n], "External_Id__c": [f"C-{i}" for i in n]})
+
+
+def _opportunities(start, count):
+    return pd.DataFrame({"Name": [f"Deal {i}" for i in range(start, start + count)],
+                         "StageName": "Prospecting", "CloseDate": "31/12/2026", "Amount": 1000.0})
+
+
+def _pipeline(count, seed=7):
+    """Opportunities already in the org, spread over two years of close dates and the standard stages"""
+    rng = np.random.default_rng(seed)
+    stages = np.array(["Prospecting", "Qualification", "Needs Analysis", "Proposal/Price Quote", "Negotiation/Review",
+                       "Closed Won", "Closed Lost"])
+    forecast = np.array(["Pipeline", "Pipeline", "Pipeline", "Pipeline", "Commit", "Closed", "Omitted"])
+    probability = np.array([10, 20, 30, 60, 80, 100, 0])
+    stage = rng.integers(0, len(stages), count)
+    amount = rng.integers(1, 500, count) * 100.0
+    close = pd.Timestamp.today().normalize() + pd.to_timedelta(rng.integers(-365, 365, count), unit="D")
+    return pd.DataFrame({"Name": [f"Deal {i}" for i in range(count)], "StageName": stages[stage],
+                         "ForecastCategoryName": forecast[stage], "CloseDate": close.strftime("%Y-%m-%d"),
+                         "Amount": amount, "Probability": probability[stage],
+                         "ExpectedRevenue": amount * probability[stage] / 100})
+
+
+def _leads(start, count):
+    return pd.DataFrame({"LastName": [f"Lead{i}" for i in range(start, start + count)],
+                         "Company": [f"Acme {i % 5000}" for i in range(start, start + count)],
+                         "Status": "Open - Not Contacted"})
+
+
+def _seed(server, object_name, frame):
+    server.add(object_name, frame.to_dict("records"))
+
+
+# ------------------- SCENARIOS -------------------
+# Each scenario seeds the mock org and builds its upload file, then returns
+# the timed part: a callable running the app code that returns
+# (records processed, per-operation latencies in seconds).
+
+def _dup_check(server, sf, scale, spec, frame):
+    """Load what the duplicate check compares against, then flag duplicates per upload chunk (50% existing)"""
+    import file_reader
+    import object_engine
+
+    _seed(server, spec["object"], frame(0, scale))
+    upload = _upload(frame(scale // 2, scale))
+
+    def work():
+        start = time.perf_counter()
+        existing = object_engine.existing_keys(sf, spec)
+        latencies = [time.perf_counter() - start]
+        for chunk in file_reader.iter_upload_chunks(upload):
+            start = time.perf_counter()
+            object_engine.duplicate_mask(sf, spec, chunk, existing)
+            latencies.append(time.perf_counter() - start)
+        return scale, latencies
+    return work
+
+
+def _journal_key(sf, spec, upload, external_id=None):
+    """Journal key of an upload, with any journal an earlier scenario left under it dropped"""
+    import object_engine
+    import upload_journal
+
+    key = object_engine.upload_key(upload_journal.file_hash(upload), spec, external_id)
+    conn = upload_journal.connect(sf)
+    try:
+        upload_journal.forget(conn, key)
+    finally:
+        conn.close()
+    return key
+
+
+def _insert(server, sf, scale, spec, frame, mode="bulk1"):
+    """object_engine.journaled_insert of an upload with no existing records: duplicate check journaled
+    per row, then concurrent 200-record batches ("bulk1") or streamed Bulk API 2.0 jobs ("bulk2"),
+    and the outcome file"""
+    import object_engine
+
+    upload = _upload(frame(0, scale))
+    key = _journal_key(sf, spec, upload)
+
+    def work():
+        totals = object_engine.journaled_insert(sf, spec, upload, key, mode=mode)
+        assert totals["success"] == scale, totals
+        return scale, server.job_times
+    return work
+
+
+def scenario_account_dup_check(server, sf, scale):
+    """Local Account index sync, then the per-chunk name lookup"""
+    import object_specs
+    return _dup_check(server, sf, scale, object_specs.ACCOUNT, _accounts)
+
+
+def scenario_contact_dup_check(server, sf, scale):
+    """Fetch all existing Contact key hashes, then the vectorized per-chunk mask"""
+    import object_specs
+    return _dup_check(server, sf, scale, object_specs.CONTACT, _contacts)
+
+
+def scenario_contact_small_upload(server, sf, scale):
+    """Duplicate check of a 100-row upload (half existing) against an org of `scale` contacts: the
+    planner probes the upload's emails instead of reading every contact"""
+    import object_engine
+    import object_specs
+
+    _seed(server, "Contact", _contacts(0, scale))
+    upload = _upload(_contacts(scale - 50, 100))
+
+    def work():
+        start = time.perf_counter()
+        total, duplicates, plan = object_engine.count_duplicates(sf, object_specs.CONTACT, upload)
+        assert (total, duplicates, plan["method"]) == (100, 50, "probe"), (total, duplicates, plan)
+        return total, [time.perf_counter() - start]
+    return work
+
+
+def scenario_account_fuzzy_check(server, sf, scale):
+    """Near-duplicate review of an upload a tenth the size of the org (a fifth of it "ACME, INC."
+    variants of existing names): Account index sync, LSH index build and matching"""
+    import file_reader
+    import fuzzy_match
+    import object_specs
+
+    existing = _company_names(scale, seed=1)
+    _seed(server, "Account", pd.DataFrame({"Name": existing}))
+    count = max(scale // 10, 1)
+    variants = existing.sample(count // 5, random_state=2).str.upper().str.replace(" ", ", ", n=1) + " Inc."
+    upload = _upload(pd.DataFrame({"Name": pd.concat([variants, _company_names(count - len(variants), seed=3)])}))
+
+    def work():
+        start = time.perf_counter()
+        found = fuzzy_match.likely_duplicates(sf, object_specs.ACCOUNT, file_reader.iter_upload_chunks(upload))
+        assert len(found) >= len(variants), (len(found), len(variants))
+        return count, [time.perf_counter() - start]
+    return work
+
+
+def scenario_account_insert(server, sf, scale):
+    import object_specs
+    return _insert(server, sf, scale, object_specs.ACCOUNT, _accounts)
+
+
+def scenario_contact_insert(server, sf, scale):
+    import object_specs
+    return _insert(server, sf, scale, object_specs.CONTACT, _contacts)
+
+
+def scenario_contact_insert_bulk2(server, sf, scale):
+    import object_specs
+    return _insert(server, sf, scale, object_specs.CONTACT, _contacts, mode="bulk2")
+
+
+def _upsert(server, sf, scale, mode):
+    """object_engine.journaled_insert upserting Contacts on an External ID, half of them already in the
+    org: no reads, Salesforce matches the rows itself"""
+    import object_engine
+    import object_specs
+
+    _seed(server, "Contact", _contacts(0, scale // 2))
+    upload = _upload(_contacts(0, scale))
+    key = _journal_key(sf, object_specs.CONTACT, upload, "External_Id__c")
+
+    def work():
+        totals = object_engine.journaled_insert(sf, object_specs.CONTACT, upload, key,
+                                                mode=mode, external_id="External_Id__c")
+        assert (totals["success"], totals["created"]) == (scale, scale - scale // 2), totals
+        return scale, server.job_times
+    return work
+
+
+def scenario_contact_upsert(server, sf, scale):
+    return _upsert(server, sf, scale, "bulk1")
+
+
+def scenario_contact_upsert_bulk2(server, sf, scale):
+    return _upsert(server, sf, scale, "bulk2")
+
+
+def scenario_opportunity_upload(server, sf, scale):
+    import object_specs
+    return _insert(server, sf, scale, object_specs.OPPORTUNITY, _opportunities)
+
+
+def scenario_lead_upload(server, sf, scale):
+    import object_specs
+    return _insert(server, sf, scale, object_specs.LEAD, _leads)
+
+
+def scenario_search(server, sf, scale):
+    """First and second page of the four searches for a handful of terms, through the search cache"""
+    import object_engine
+    import object_specs
+
+    per_object = max(scale // 4, 1)
+    _seed(server, "Account", _accounts(0, per_object))
+    _seed(server, "Contact", _contacts(0, per_object))
+    _seed(server, "Opportunity", _opportunities(0, per_object))
+    _seed(server, "Lead", _leads(0, per_object))
+    specs = [object_specs.ACCOUNT, object_specs.CONTACT, object_specs.OPPORTUNITY, object_specs.LEAD]
+
+    def work():
+        latencies = []
+        for spec in specs:
+            for term in SEARCH_TERMS:
+                after_id = None
+                for _ in range(2):
+                    start = time.perf_counter()
+                    page = object_engine.search(sf, spec, term, after_id)
+                    latencies.append(time.perf_counter() - start)
+                    if not page["has_more"]:
+                        break
+                    after_id = page["records"][-1]["Id"]
+        return scale, latencies
+    return work
+
+
+def scenario_search_replica(server, sf, scale):
+    """The search scenario answered from the local replica; its initial load is neither timed nor
+    counted in the calls"""
+    import local_replica
+    import object_engine
+    import object_specs
+
+    local_replica.ENABLED = True
+    work = scenario_search(server, sf, scale)
+    for spec in object_specs.SPECS.values():
+        local_replica.sync(sf, spec["object"], object_engine.select_fields(spec).split(", "), spec["search_fields"])
+    server.calls.clear()
+    return work
+
+
+def scenario_search_burst(server, sf, scale):
+    """Eight users running the same first-page searches at the same moment, cold cache: identical
+    queries in flight are shared, so the calls match a single user's"""
+    from concurrent.futures import ThreadPoolExecutor as Users
+
+    import object_engine
+    import object_specs
+
+    per_object = max(scale // 4, 1)
+    _seed(server, "Account", _accounts(0, per_object))
+    _seed(server, "Contact", _contacts(0, per_object))
+    specs = [object_specs.ACCOUNT, object_specs.CONTACT]
+    searches = [(spec, term) for spec in specs for term in SEARCH_TERMS]
+
+    def one_user(_):
+        latencies = []
+        for spec, term in searches:
+            start = time.perf_counter()
+            object_engine.search(sf, spec, term)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    def work():
+        with Users(max_workers=8) as users:
+            latencies = [lat for user in users.map(one_user, range(8)) for lat in user]
+        return len(latencies), latencies
+    return work
+
+
+def scenario_global_search(server, sf, scale):
+    """The same terms through one SOSL call across the four objects (10 records per object)"""
+    import global_search
+    import object_specs
+
+    per_object = max(scale // 4, 1)
+    _seed(server, "Account", _accounts(0, per_object))
+    _seed(server, "Contact", _contacts(0, per_object))
+    _seed(server, "Opportunity", _opportunities(0, per_object))
+    _seed(server, "Lead", _leads(0, per_object))
+    specs = list(object_specs.SPECS.values())
+
+    def work():
+        latencies = []
+        for term in SEARCH_TERMS:
+            if len(term) < global_search.MIN_TERM_CHARS:
+                continue
+            start = time.perf_counter()
+            global_search.search_all(sf, specs, term)
+            latencies.append(time.perf_counter() - start)
+        return len(latencies), latencies
+    return work
+
+
+def scenario_pipeline_dashboard(server, sf, scale):
+    """Pipeline dashboard data for the default two-year range: one aggregate query, then nine cached reruns"""
+    from datetime import date
+
+    import object_specs
+    import pipeline_dashboard
+
+    _seed(server, "Opportunity", _pipeline(scale))
+    start, end = pipeline_dashboard.default_range(date.today())
+
+    def work():
+        latencies = []
+        for _ in range(10):
+            begin = time.perf_counter()
+            frame = pipeline_dashboard.pipeline(sf, object_specs.OPPORTUNITY, start, end)
+            latencies.append(time.perf_counter() - begin)
+        return int(frame["deals"].sum()), latencies
+    return work
+
+
+SCENARIOS = {
+    "account_dup_check": scenario_account_dup_check,
+    "contact_dup_check": scenario_contact_dup_check,
+    "contact_small_upload": scenario_contact_small_upload,
+    "account_fuzzy_check": scenario_account_fuzzy_check,
+    "account_insert": scenario_account_insert,
+    "contact_insert": scenario_contact_insert,
+    "contact_insert_bulk2": scenario_contact_insert_bulk2,
+    "contact_upsert": scenario_contact_upsert,
+    "contact_upsert_bulk2": scenario_contact_upsert_bulk2,
+    "opportunity_upload": scenario_opportunity_upload,
+    "lead_upload": scenario_lead_upload,
+    "search": scenario_search,
+    "search_replica": scenario_search_replica,
+    "search_burst": scenario_search_burst,
+    "global_search": scenario_global_search,
+    "pipeline_dashboard": scenario_pipeline_dashboard,
+}
+
+
+# ------------------- RUNNER -------------------
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_one(name, scale, latency, page_size):
+    """Run one scenario in the current (fresh) process and return its metrics"""
+    os.environ["SFDC_CACHE_DIR"] = tempfile.mkdtemp(prefix="sfdc_bench_")
+    from benchmarks import mock_salesforce
+
+    server = mock_salesforce.MockSalesforce(latency=latency, page_size=page_size)
+    sf = mock_salesforce.connect(server)
+    work = SCENARIOS[name](server, sf, scale)
+    setup_rss = _peak_rss_mb()
+    start = time.perf_counter()
+    records, latencies = work()
+    elapsed = time.perf_counter() - start
+    latencies = np.array(latencies or [elapsed])
+    return {
+        "scenario": name,
+        "records": records,
+        "seconds": round(elapsed, 3),
+        "records_per_s": round(records / elapsed, 1) if elapsed else None,
+        "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 2),
+        "p99_ms": round(float(np.percentile(latencies, 99)) * 1000, 2),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "setup_rss_mb": round(setup_rss, 1),
+        "api_calls": sum(server.calls.values()),
+        "calls": dict(sorted(server.calls.items())),
+    }
+
+
+def _print_table(results):
+    header = f"{'scenario':<20}{'records':>10}{'seconds':>10}{'rec/s':>12}{'p50 ms':>10}{'p99 ms':>10}" \
+             f"{'RSS MB':>9}{'(setup)':>9}{'calls':>8}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['scenario']:<20}{r['records']:>10}{r['seconds']:>10}{r['records_per_s']:>12}"
+              f"{r['p50_ms']:>10}{r['p99_ms']:>10}{r['peak_rss_mb']:>9}{r['setup_rss_mb']:>9}{r['api_calls']:>8}")
+        print(f"{'':<20}  {', '.join(f'{k}={v}' for k, v in r['calls'].items())}")
+
+
+def _regressions(results, baseline, tolerance):
+    """Scenario/scale pairs whose throughput fell more than `tolerance` below the baseline"""
+    before = {(r["scenario"], r["records"]): r for r in baseline}
+    slow = []
+    for r in results:
+        old = before.get((r["scenario"], r["records"]))
+        if old and old["records_per_s"] and r["records_per_s"] < old["records_per_s"] * (1 - tolerance):
+            slow.append(f"{r['scenario']} @ {r['records']}: {old['records_per_s']} -> {r['records_per_s']} rec/s")
+    return slow
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default=",".join(map(str, SCALES)), help="comma-separated record counts")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated scenario names")
+    parser.add_argument("--latency", type=float, default=0.01, help="seconds added to every mock API call")
+    parser.add_argument("--page-size", type=int, default=2000, help="records per REST query page")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="compare throughput against results saved with --json")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed throughput drop vs baseline")
+    args = parser.parse_args(argv)
+
+    names = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    results = []
+    for scale in [int(s) for s in args.scales.split(",")]:
+        for name in names:
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                result = pool.submit(run_one, name, scale, args.latency, args.page_size).result()
+            results.append(result)
+            print(f"{name} @ {scale}: {result['seconds']}s", file=sys.stderr)
+
+    _print_table(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            slow = _regressions(results, json.load(f), args.tolerance)
+        for line in slow:
+            print(f"REGRESSION {line}")
+        return 1 if slow else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""Measure app startup: import time of app.py's top-level imports and time to the login screen.
+
+    python -m benchmarks.startup                    # current tree
+    python -m benchmarks.startup --compare HEAD~1   # current tree vs a git revision
+
+Every sample runs in a fresh interpreter, so imports are cold each time.
+The login screen is rendered with Streamlit's AppTest (no browser needed).
+"""
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside the fresh interpreter, with the tree to measure as cwd
+_PROBE = r"""
+import ast, json, sys, time
+sys.path.insert(0, ".")
+tree = ast.parse(open("app.py", encoding="utf-8").read())
+imports = ast.Module(body=[n for n in tree.body if isinstance(n, (ast.Import, ast.ImportFrom))], type_ignores=[])
+start = time.perf_counter()
+exec(compile(imports, "app.py", "exec"), {})
+import_s = time.perf_counter() - start
+
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("app.py", default_timeout=120)
+start = time.perf_counter()
+at.run()
+# The imports are already cached here, so a cold start costs both
+login_s = import_s + time.perf_counter() - start
+print(json.dumps({
+    "import_s": import_s,
+    "login_screen_s": login_s,
+    "login_rendered": len(at.text_input) >= 3 and not at.exception,
+    "pandas_loaded": "pandas" in sys.modules,
+    "simple_salesforce_loaded": "simple_salesforce" in sys.modules,
+    "modules": len(sys.modules),
+}))
+"""
+
+
+def _sample(tree):
+    env = dict(os.environ, SFDC_CACHE_DIR=tempfile.mkdtemp(prefix="sfdc_startup_"))
+    out = subprocess.run([sys.executable, "-c", _PROBE], cwd=tree, env=env,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def measure(tree, runs):
+    """Median import and login-screen times of `runs` cold starts of the app in `tree`"""
+    samples = [_sample(tree) for _ in range(runs)]
+    result = {key: statistics.median(s[key] for s in samples) for key in ("import_s", "login_screen_s")}
+    for key in ("login_rendered", "pandas_loaded", "simple_salesforce_loaded", "modules"):
+        result[key] = samples[-1][key]
+    return result
+
+
+def _export(rev):
+    """Unpack a git revision of the repository into a temporary directory"""
+    target = tempfile.mkdtemp(prefix="sfdc_rev_")
+    archive = subprocess.run(["git", "archive", rev], cwd=ROOT, capture_output=True, check=True).stdout
+    subprocess.run(["tar", "-x", "-C", target], input=archive, check=True)
+    return target
+
+
+def _top_level_imports(tree):
+    with open(os.path.join(tree, "app.py"), encoding="utf-8") as f:
+        body = ast.parse(f.read()).body
+    names = []
+    for node in body:
+        if isinstance(node, ast.Import):
+            names.extend(a.name for a in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            names.append(node.module)
+    return names
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="cold starts per tree (median is reported)")
+    parser.add_argument("--compare", metavar="REV", help="also measure this git revision")
+    args = parser.parse_args(argv)
+
+    trees = [("current", ROOT)]
+    if args.compare:
+        trees.insert(0, (args.compare, _export(args.compare)))
+
+    results = []
+    for label, tree in trees:
+        result = measure(tree, args.runs)
+        results.append(result)
+        print(f"{label}: app.py imports {', '.join(_top_level_imports(tree))}")
+        print(f"  import time         {result['import_s'] * 1000:8.1f} ms")
+        print(f"  time to login screen{result['login_screen_s'] * 1000:8.1f} ms"
+              f"{'' if result['login_rendered'] else '  (login form NOT rendered)'}")
+        print(f"  modules loaded      {result['modules']:8d}  (pandas: {result['pandas_loaded']}, "
+              f"simple_salesforce: {result['simple_salesforce_loaded']})")
+
+    if len(results) == 2:
+        before, after = results
+        for key, title in (("import_s", "import time"), ("login_screen_s", "time to login screen")):
+            saved = before[key] - after[key]
+            print(f"{title}: {saved * 1000:+.1f} ms saved ({saved / before[key]:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
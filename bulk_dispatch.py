@@ -0,0 +1,166 @@
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# ------------------- CONCURRENT BATCH DISPATCH -------------------
+# Every bulk insert call creates a job, uploads one batch and then polls
+# until Salesforce has processed it, so sending batches one after another
+# leaves the connection idle most of the time. The dispatcher keeps up to
+# WORKERS batches in flight. When Salesforce reports limit pressure or row
+# lock contention it halves the number in flight and pauses; after a run
+# of clean batches it grows back one at a time. Results are collected on
+# the calling thread, so counters and the progress callback never race.
+
+WORKERS = int(os.environ.get("SFDC_BULK_WORKERS", "4"))
+BATCH_SIZE = 200
+MAX_RETRIES = 3
+MAX_FAILURE_ROWS = 1000
+BACKOFF_SECONDS = 2.0
+CONTENTION_CODES = ("REQUEST_LIMIT_EXCEEDED", "UNABLE_TO_LOCK_ROW", "ExceededQuota",
+                    "TooManyRequests", "SERVER_UNAVAILABLE")
+
+
+def _is_contention(text):
+    return any(code in text for code in CONTENTION_CODES)
+
+
+def _row_contention(result):
+    """True if a per-record result failed only because of lock/limit contention"""
+    errors = result.get("errors") or []
+    return bool(errors) and all(
+        _is_contention(str(e.get("statusCode", "")) if isinstance(e, dict) else str(e)) for e in errors
+    )
+
+
+class _Throttle:
+    """Additive-increase / multiplicative-decrease limit on batches in flight"""
+
+    def __init__(self, workers):
+        self.max = max(1, workers)
+        self.limit = self.max
+        self.clean = 0
+        self.resume_at = 0.0
+
+    def contended(self, attempt):
+        self.limit = max(1, self.limit // 2)
+        self.clean = 0
+        delay = BACKOFF_SECONDS * (2 ** attempt) * random.uniform(0.5, 1.5)
+        self.resume_at = max(self.resume_at, time.monotonic() + delay)
+
+    def succeeded(self):
+        self.clean += 1
+        if self.limit < self.max and self.clean >= self.limit:
+            self.limit += 1
+            self.clean = 0
+
+
+def dispatch(insert, batches, workers=WORKERS, on_progress=None, on_outcomes=None):
+    """Send each batch through `insert(batch)` with up to `workers` calls in flight.
+
+    `batches` is consumed lazily, so a streamed upload never holds more than
+    the in-flight batches in memory. Records rejected with UNABLE_TO_LOCK_ROW
+    or a limit error are resent (up to MAX_RETRIES times); a call that fails
+    as a whole is not resent, because its job may already have been created.
+    Returns {"success", "created", "failed", "retried", "errors", "failures"};
+    "created" counts the successes that created a record (the rest of an
+    upsert's successes updated one) and "failures" holds up to
+    MAX_FAILURE_ROWS (record, error message) pairs.
+
+    `on_outcomes(outcomes)` is called on the calling thread with the final
+    (record, record id, error message, whole_call_failed, created) of every
+    record of each finished call; records being resent are reported when
+    they settle.
+    """
+    totals = {"success": 0, "created": 0, "failed": 0, "retried": 0, "errors": [], "failures": []}
+
+    def record_failure(record, message):
+        totals["failed"] += 1
+        if len(totals["failures"]) < MAX_FAILURE_ROWS:
+            totals["failures"].append((record, message))
+
+    throttle = _Throttle(workers)
+    source = iter(batches)
+    exhausted = False
+    retries = deque()        # (batch, attempt) waiting to be resent
+    in_flight = {}           # future -> (batch, attempt)
+
+    with ThreadPoolExecutor(max_workers=throttle.max) as pool:
+        while True:
+            paused = time.monotonic() < throttle.resume_at
+            while not paused and len(in_flight) < throttle.limit:
+                if retries:
+                    batch, attempt = retries.popleft()
+                elif not exhausted:
+                    batch, attempt = next(source, None), 0
+                    if batch is None:
+                        exhausted = True
+                        continue
+                else:
+                    break
+                if batch:
+                    in_flight[pool.submit(insert, batch)] = (batch, attempt)
+
+            if not in_flight:
+                if exhausted and not retries:
+                    break
+                time.sleep(max(throttle.resume_at - time.monotonic(), 0))
+                continue
+
+            timeout = max(throttle.resume_at - time.monotonic(), 0) if paused else None
+            done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch, attempt = in_flight.pop(future)
+                outcomes = []
+                try:
+                    results = list(future.result())
+                except Exception as e:
+                    if _is_contention(str(e)):
+                        throttle.contended(attempt)
+                    for record in batch:
+                        record_failure(record, str(e))
+                        outcomes.append((record, None, str(e), True, False))
+                    totals["errors"].append(str(e))
+                else:
+                    resend = []
+                    for record, result in zip(batch, results):
+                        if result.get("success"):
+                            totals["success"] += 1
+                            totals["created"] += bool(result.get("created"))
+                            outcomes.append((record, result.get("id"), None, False, bool(result.get("created"))))
+                        elif attempt < MAX_RETRIES and _row_contention(result):
+                            resend.append(record)
+                        else:
+                            message = "; ".join(
+                                e.get("message", "") if isinstance(e, dict) else str(e)
+                                for e in result.get("errors") or []
+                            )
+                            record_failure(record, message)
+                            outcomes.append((record, None, message, False, False))
+                    if resend:
+                        throttle.contended(attempt)
+                        retries.append((resend, attempt + 1))
+                        totals["retried"] += len(resend)
+                    else:
+                        throttle.succeeded()
+                if on_outcomes and outcomes:
+                    on_outcomes(outcomes)
+                if on_progress:
+                    on_progress(totals)
+    return totals
+
+
+def insert_records(sf, object_name, batches, workers=WORKERS, on_progress=None, on_outcomes=None):
+    """Bulk-insert batches of `object_name` records concurrently (one Bulk API job per batch)"""
+    bulk_type = getattr(sf.bulk, object_name)
+    return dispatch(lambda batch: bulk_type.insert(batch, batch_size=len(batch)), batches,
+                    workers=workers, on_progress=on_progress, on_outcomes=on_outcomes)
+
+
+def upsert_records(sf, object_name, external_id, batches, workers=WORKERS, on_progress=None, on_outcomes=None):
+    """Bulk-upsert batches of `object_name` records matched on the `external_id` field: Salesforce
+    updates the records whose External ID it finds and creates the rest"""
+    bulk_type = getattr(sf.bulk, object_name)
+    return dispatch(lambda batch: bulk_type.upsert(batch, external_id, batch_size=len(batch)), batches,
+                    workers=workers, on_progress=on_progress, on_outcomes=on_outcomes)
@@ -0,0 +1,232 @@
+import csv
+import io
+import os
+import tempfile
+import time
+
+from simple_salesforce.util import exception_handler
+
+import bulk_dispatch
+import local_store
+
+# ------------------- BULK API 2.0 INGEST -------------------
+# Large uploads go to Salesforce as CSV ingest jobs instead of one Bulk v1
+# job per 200 records. The new rows are written to a temporary CSV on disk
+# and streamed to the job, a new job is started whenever a file would pass
+# MAX_JOB_BYTES, and the per-record result CSVs are streamed back to files
+# in the cache directory, so neither side of the load is held in memory.
+# The result rows carry the values that were sent, not row numbers, so a
+# job's rows are matched back to them by a hash of those values (see
+# _settle()); each job's CSV file is kept on disk until that is done.
+
+# Salesforce accepts 150MB per job upload after base64 encoding, which is
+# about 100MB of raw CSV.
+MAX_JOB_BYTES = int(os.environ.get("SFDC_BULK2_MAX_BYTES", str(100 * 1024 * 1024)))
+# "auto" uploads use Bulk API 2.0 from this many new rows
+AUTO_ROWS = int(os.environ.get("SFDC_BULK2_THRESHOLD", "50000"))
+POLL_SECONDS = 1.0
+MAX_POLL_SECONDS = 30.0
+RESULT_KINDS = ("successfulResults", "failedResults", "unprocessedrecords")
+
+MODES = {
+    "auto": f"Auto (Bulk API 2.0 from {AUTO_ROWS:,} new rows)",
+    "bulk1": "Bulk API, 200-record batches",
+    "bulk2": "Bulk API 2.0, streamed CSV job",
+}
+
+
+def choose_mode(mode, row_count):
+    """Resolve "auto" to "bulk1" or "bulk2" for an upload of `row_count` new rows"""
+    if mode == "auto":
+        return "bulk2" if row_count >= AUTO_ROWS else "bulk1"
+    return mode
+
+
+def _call(sf, method, path, content_type="application/json", **kwargs):
+    headers = dict(sf.headers, **{"Content-Type": content_type})
+    headers.update(kwargs.pop("headers", {}))
+    result = sf.session.request(method, sf.bulk2_url + "ingest" + path, headers=headers, **kwargs)
+    if result.status_code >= 300:
+        exception_handler(result, "bulk2")
+    return result
+
+
+def _csv_parts(frames):
+    """Write the frames as CSV temp files of at most MAX_JOB_BYTES; yields (open file, frame index values)"""
+    columns = None
+    part, rows = None, []
+    for frame in frames:
+        if frame.empty:
+            continue
+        if columns is None:
+            columns = list(frame.columns)
+        data = frame.reindex(columns=columns).to_csv(index=False, header=False, lineterminator="\n").encode()
+        if part is not None and part.tell() + len(data) > MAX_JOB_BYTES:
+            yield part, rows
+            part = None
+        if part is None:
+            part = tempfile.TemporaryFile()
+            part.write((",".join(columns) + "\n").encode())
+            rows = []
+        part.write(data)
+        rows.extend(frame.index)
+    if part is not None:
+        yield part, rows
+
+
+def _start_job(sf, object_name, part, external_id=None):
+    """Create an insert job (an upsert on `external_id` if given), stream the CSV file into it and mark
+    the upload complete"""
+    spec = {"object": object_name, "operation": "insert", "contentType": "CSV", "lineEnding": "LF"}
+    if external_id:
+        spec.update(operation="upsert", externalIdFieldName=external_id)
+    job = _call(sf, "POST", "", json=spec).json()
+    part.seek(0)
+    _call(sf, "PUT", f"/{job['id']}/batches", content_type="text/csv", data=part)
+    _call(sf, "PATCH", f"/{job['id']}", json={"state": "UploadComplete"})
+    return job["id"]
+
+
+def _wait(sf, job_id):
+    """Poll a job with growing intervals until Salesforce has finished it"""
+    delay = POLL_SECONDS
+    while True:
+        info = _call(sf, "GET", f"/{job_id}").json()
+        if info["state"] in ("JobComplete", "Failed", "Aborted"):
+            return info
+        time.sleep(delay)
+        delay = min(delay * 2, MAX_POLL_SECONDS)
+
+
+def _download(sf, job_id, kind):
+    """Stream one result CSV of a job to the cache directory; returns its path"""
+    path = local_store.org_path(sf, f"bulk2_{job_id}_{kind}.csv")
+    with _call(sf, "GET", f"/{job_id}/{kind}", headers={"Accept": "text/csv"}, stream=True) as result, \
+            open(path, "wb") as out:
+        for block in result.iter_content(chunk_size=64 * 1024):
+            out.write(block)
+    return path
+
+
+def _count_created(path):
+    """Rows of a successfulResults file that created a record (sf__Created)"""
+    with open(path, newline="", encoding="utf-8") as f:
+        return sum(1 for row in csv.DictReader(f) if row.get("sf__Created") == "true")
+
+
+def _read_failures(path, limit):
+    """First `limit` (record, error) pairs of a failedResults / unprocessedrecords file"""
+    failures = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if len(failures) >= limit:
+                break
+            message = row.pop("sf__Error", None) or "Not processed"
+            row.pop("sf__Id", None)
+            failures.append(({k: v for k, v in row.items() if v != ""}, message))
+    return failures
+
+
+def _row_hash(values):
+    return hash(tuple(values))
+
+
+def _settle(part, index, results):
+    """Match the rows of a job's CSV file to its downloaded `results` ((kind, path) pairs).
+
+    Returns (index value, kind, record id, error, created) per row; kind is
+    None for a row no result file mentions.
+    """
+    part.seek(0)
+    text = io.TextIOWrapper(part, encoding="utf-8", newline="")
+    try:
+        reader = csv.reader(text)
+        columns = next(reader)
+        # Identical rows share a hash and take the results of their values in turn
+        waiting = {}
+        for value, row in zip(index, reader):
+            waiting.setdefault(_row_hash(row), []).append(value)
+    finally:
+        text.detach()
+    settled = []
+    for kind, path in results:
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                values = waiting.get(_row_hash(row.get(c) or "" for c in columns))
+                if values:
+                    settled.append((values.pop(), kind, row.get("sf__Id") or None, row.get("sf__Error") or None,
+                                    row.get("sf__Created") == "true"))
+    settled.extend((value, None, None, None, False) for values in waiting.values() for value in values)
+    return settled
+
+
+def insert_frames(sf, object_name, frames, on_progress=None, on_submitted=None, on_settled=None,
+                  external_id=None):
+    """Insert the rows of `frames` through Bulk API 2.0 ingest jobs (upsert them on the
+    `external_id` field if given).
+
+    Returns the same totals as bulk_dispatch.dispatch plus "jobs" (job ids)
+    and "result_files" (paths of the downloaded result CSVs).
+    `on_submitted(job_id, index values)` is called once a job holds its rows,
+    and `on_settled(job_id, outcomes)` once its results are in, with the
+    outcome of each row as returned by _settle(). A job that did not
+    complete, or whose results could not be read, settles every row with
+    kind None.
+    """
+    totals = {"success": 0, "created": 0, "failed": 0, "retried": 0, "errors": [], "failures": [],
+              "jobs": [], "result_files": []}
+
+    # Every part is uploaded before any is polled, so Salesforce processes
+    # one job while the next file is being written and sent.
+    pending = []
+    for part, index in _csv_parts(frames):
+        try:
+            job_id = _start_job(sf, object_name, part, external_id)
+        except Exception as e:
+            part.close()
+            totals["failed"] += len(index)
+            totals["errors"].append(str(e))
+            continue
+        if not on_settled:
+            part.close()
+        pending.append((job_id, part, index))
+        if on_submitted:
+            on_submitted(job_id, index)
+
+    for job_id, part, index in pending:
+        totals["jobs"].append(job_id)
+        results = []
+        try:
+            info = _wait(sf, job_id)
+        except Exception as e:
+            info = {"state": "Unknown", "errorMessage": str(e)}
+        if info["state"] != "JobComplete":
+            totals["failed"] += len(index)
+            totals["errors"].append(f"Job {job_id} {info['state']}: {info.get('errorMessage', '')}")
+        else:
+            processed = int(info.get("numberRecordsProcessed", 0))
+            failed = int(info.get("numberRecordsFailed", 0))
+            totals["success"] += processed - failed
+            totals["failed"] += failed + len(index) - processed
+            if not external_id:
+                totals["created"] += processed - failed
+            try:
+                for kind in RESULT_KINDS:
+                    path = _download(sf, job_id, kind)
+                    totals["result_files"].append(path)
+                    results.append((kind, path))
+                    if external_id and kind == "successfulResults":
+                        totals["created"] += _count_created(path)
+                    room = bulk_dispatch.MAX_FAILURE_ROWS - len(totals["failures"])
+                    if kind != "successfulResults" and room > 0:
+                        totals["failures"].extend(_read_failures(path, room))
+            except Exception as e:
+                results = []
+                totals["errors"].append(f"Could not download the results of job {job_id}: {e}")
+        if on_settled:
+            with part:
+                on_settled(job_id, _settle(part, index, results) if results
+                           else [(value, None, None, None, False) for value in index])
+        if on_progress:
+            on_progress(totals)
+    return totals
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+import record_frame
+
+# ------------------- DUPLICATE KEYS -------------------
+# Duplicate keys are built column-wise ("first|last|email", trimmed and
+# lowercased) and hashed to uint64, so membership checks run on compact
+# sorted integer arrays instead of Python sets of strings.
+
+PAGE_ROWS = 2000
+
+
+def build_keys(df, columns):
+    """Vectorized "a|b|c" key per row; missing columns and blank cells count as empty strings"""
+    parts = []
+    for col in columns:
+        if col in df.columns:
+            parts.append(df[col].fillna("").astype(str).str.strip().str.lower())
+        else:
+            parts.append(pd.Series("", index=df.index))
+    if not parts:
+        return pd.Series("", index=df.index)
+    return parts[0].str.cat(parts[1:], sep="|") if len(parts) > 1 else parts[0]
+
+
+def hash_keys(keys):
+    """64-bit hash of each key string"""
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+
+def existing_key_hashes(records, columns):
+    """Sorted, unique key hashes for an iterable of Salesforce records (consumed page by page)"""
+    hashes = []
+    page = []
+    for r in records:
+        page.append(r)
+        if len(page) >= PAGE_ROWS:
+            hashes.append(hash_keys(build_keys(record_frame.to_frame(page, columns), columns)))
+            page = []
+    if page:
+        hashes.append(hash_keys(build_keys(record_frame.to_frame(page, columns), columns)))
+    if not hashes:
+        return np.empty(0, dtype=np.uint64)
+    return np.unique(np.concatenate(hashes))
+
+
+def is_existing(hashes, existing_sorted):
+    """Boolean mask of which `hashes` appear in the sorted `existing_sorted` array"""
+    if len(existing_sorted) == 0:
+        return np.zeros(len(hashes), dtype=bool)
+    pos = np.searchsorted(existing_sorted, hashes)
+    pos[pos == len(existing_sorted)] = 0
+    return existing_sorted[pos] == hashes
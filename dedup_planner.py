@@ -0,0 +1,96 @@
+import math
+from urllib.parse import quote
+
+import account_index
+import dedup
+import pagination
+
+# ------------------- DEDUP PLANNER -------------------
+# An upload is checked for duplicates either by pulling every existing key
+# of the object ("scan") or by asking Salesforce only about the values in
+# the upload ("probe": chunked `WHERE <field> IN (...)` queries). A SELECT
+# COUNT() sizes the scan, the upload is read until its probes would cost as
+# many calls as the scan, and the cheaper plan wins. A built Account index
+# is always used, since keeping it current only costs a delta query.
+# Planning keeps only the distinct probe values (at most MAX_PROBE_VALUES
+# per field), never the rows: the upload is read again for the check.
+
+SCAN_PAGE_ROWS = 2000        # records per query/queryMore page
+# SOQL goes in the GET query string; the encoded IN list of one probe stays
+# well under the ~16k character URL limit.
+PROBE_URL_CHARS = 12000
+# More distinct values than this and the upload is scanned against instead of probed
+MAX_PROBE_VALUES = 100_000
+
+
+def probe_fields(spec):
+    """Key fields that can be probed, most selective first (e.g. Email before names)"""
+    preferred = spec.get("probe_field")
+    return ([preferred] if preferred else []) + [f for f in spec["key_fields"] if f != preferred]
+
+
+def _value_cost(value):
+    return len(quote(f"'{pagination.soql_escape(value)}',"))
+
+
+def plan(sf, spec, read_chunks):
+    """Choose how to check an upload for duplicates; `read_chunks()` reads the upload from the start.
+
+    plan["method"] is "index", "scan", "probe" or "none"; a probe plan
+    carries the field and values to ask about.
+    """
+    if not spec["key_fields"]:
+        return {"method": "none", "calls": 0}
+    if spec["dedup"] == "index" and account_index.is_built(sf):
+        return {"method": "index", "calls": 1}
+
+    org_count = sf.query(f"SELECT COUNT() FROM {spec['object']}")["totalSize"]
+    if org_count == 0:
+        return {"method": "probe", "calls": 0, "org_count": 0, "field": probe_fields(spec)[0], "values": []}
+    scan = {"method": "scan", "calls": max(1, math.ceil(org_count / SCAN_PAGE_ROWS)), "org_count": org_count}
+    # Per candidate field: lowercased value -> value (SOQL text comparisons ignore case) and the
+    # encoded length of its IN lists. A field blank in any row cannot find that row's duplicates.
+    candidates = {field: ({}, [0]) for field in probe_fields(spec)}
+    for chunk in read_chunks():
+        for field in list(candidates):
+            if field not in chunk.columns:
+                del candidates[field]
+                continue
+            text = chunk[field].fillna("").astype(str).str.strip()
+            if (text == "").any():
+                del candidates[field]
+                continue
+            values, chars = candidates[field]
+            for value in text.unique():
+                if value.lower() not in values:
+                    values[value.lower()] = value
+                    chars[0] += _value_cost(value)
+            if len(values) > MAX_PROBE_VALUES:
+                del candidates[field]
+        if not candidates or all(math.ceil(chars[0] / PROBE_URL_CHARS) >= scan["calls"]
+                                 for _, chars in candidates.values()):
+            return scan
+
+    field = next(f for f, (_, chars) in candidates.items() if math.ceil(chars[0] / PROBE_URL_CHARS) < scan["calls"])
+    values, chars = candidates[field]
+    return ({"method": "probe", "calls": max(1, math.ceil(chars[0] / PROBE_URL_CHARS)), "org_count": org_count,
+             "field": field, "values": list(values.values())})
+
+
+def probe(sf, spec, field, values):
+    """Sorted key hashes of the records whose `field` is one of `values` (chunked IN queries)"""
+    select = f"SELECT {', '.join(spec['key_fields'])} FROM {spec['object']} WHERE {field} IN "
+
+    def records():
+        batch, chars = [], 0
+        for value in values:
+            cost = _value_cost(value)
+            if batch and chars + cost > PROBE_URL_CHARS:
+                yield from sf.query_all_iter(select + f"({', '.join(batch)})")
+                batch, chars = [], 0
+            batch.append(f"'{pagination.soql_escape(value)}'")
+            chars += cost
+        if batch:
+            yield from sf.query_all_iter(select + f"({', '.join(batch)})")
+
+    return dedup.existing_key_hashes(records(), spec["key_fields"])
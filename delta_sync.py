@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta, timezone
+
+# ------------------- DELTA SYNC -------------------
+# The sync step shared by the local copies of Salesforce records (the
+# Account key index and the read replica). A copy is loaded in full the
+# first time, then kept current with a query for the records whose
+# SystemModstamp moved since the last sync plus the getDeleted resource.
+# The caller owns the storage: it passes functions that clear, write and
+# delete rows, and keeps the returned sync times for the next call.
+
+FETCH_CHUNK = 2000
+# Re-read a small window before the last sync to cover clock skew and
+# transactions that committed late.
+SYNC_OVERLAP = timedelta(minutes=5)
+# getDeleted only reaches back ~30 days; an older copy is loaded again in full.
+MAX_DELETED_WINDOW = timedelta(days=29)
+
+
+def soql_datetime(value):
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def can_delta(last_sync, now=None):
+    """True if a copy last synced at `last_sync` can be brought up to date without a full load"""
+    return last_sync is not None and (now or datetime.now(timezone.utc)) - last_sync <= MAX_DELETED_WINDOW
+
+
+def write_records(conn, statement, records, row):
+    """Run `statement` for `row(record)` of every query record, FETCH_CHUNK rows per executemany.
+
+    Returns (row count, newest SystemModstamp or None).
+    """
+    count, newest, chunk = 0, None, []
+    for record in records:
+        chunk.append(row(record))
+        # SystemModstamp is always UTC with a fixed layout, so the text compares like the time
+        if newest is None or record["SystemModstamp"] > newest:
+            newest = record["SystemModstamp"]
+        if len(chunk) >= FETCH_CHUNK:
+            conn.executemany(statement, chunk)
+            count += len(chunk)
+            chunk = []
+    if chunk:
+        conn.executemany(statement, chunk)
+        count += len(chunk)
+    return count, datetime.fromisoformat(newest) if newest else None
+
+
+def sync(sf, object_name, select, last_sync, last_modstamp, clear, write, delete, rebuild=False):
+    """Bring a local copy of `select` (a query of Id and SystemModstamp among its fields) up to date.
+
+    `clear()` empties the copy before a full load, `write(records)` stores
+    query records and returns what write_records() does, and `delete(ids)`
+    drops records deleted in Salesforce. Returns {"mode", "upserted",
+    "deleted", "last_sync", "last_modstamp"}; the caller keeps the last two
+    for its next sync.
+    """
+    now = datetime.now(timezone.utc)
+    if rebuild or not can_delta(last_sync, now):
+        clear()
+        upserted, newest = write(sf.query_all_iter(select))
+        return {"mode": "full", "upserted": upserted, "deleted": 0, "last_sync": now, "last_modstamp": newest}
+
+    since = (last_modstamp or last_sync) - SYNC_OVERLAP
+    upserted, newest = write(sf.query_all_iter(f"{select} WHERE SystemModstamp > {soql_datetime(since)}"))
+    gone = [d["id"] for d in getattr(sf, object_name).deleted(last_sync - SYNC_OVERLAP, now).get("deletedRecords", [])]
+    delete(gone)
+    if last_modstamp and (newest is None or newest < last_modstamp):
+        newest = last_modstamp
+    return {"mode": "delta", "upserted": upserted, "deleted": len(gone), "last_sync": now, "last_modstamp": newest}
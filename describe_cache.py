@@ -0,0 +1,109 @@
+import json
+import os
+import threading
+import time
+from email.utils import formatdate
+
+from simple_salesforce.exceptions import SalesforceGeneralError
+
+import local_store
+
+# ------------------- DESCRIBE CACHE -------------------
+# sObject describe() results (picklist values, lengths, required and
+# updateable flags) kept on disk per org and in memory for every session of
+# the process. Within FRESH_SECONDS a describe is served without any API
+# call; after that it is revalidated with If-Modified-Since, which costs a
+# request but no payload when the object has not changed (304).
+
+FRESH_SECONDS = int(os.environ.get("SFDC_DESCRIBE_TTL", "900"))
+CACHE_FILE = "describe_{}.json"
+
+# Only what the app uses is stored; a full describe is mostly child
+# relationships, layouts and URLs.
+_FIELD_KEYS = ("name", "label", "type", "length", "precision", "scale", "nillable", "createable",
+               "updateable", "defaultedOnCreate", "nameField", "deprecatedAndHidden",
+               "externalId", "referenceTo", "relationshipName", "picklistValues")
+# Bumped whenever _FIELD_KEYS changes, so describes cached with fewer keys are fetched again
+SLIM_VERSION = 2
+
+_lock = threading.Lock()
+_memory = {}   # (org, object) -> {"checked": epoch seconds, "modified": HTTP date, "describe": dict}
+_stats = {"memory": 0, "disk": 0, "not_modified": 0, "fetched": 0}
+
+
+def _slim(describe):
+    return {
+        "name": describe["name"],
+        "label": describe.get("label"),
+        "labelPlural": describe.get("labelPlural"),
+        "fields": [{k: f[k] for k in _FIELD_KEYS if k in f} for f in describe["fields"]],
+    }
+
+
+def _path(sf, object_name):
+    return local_store.org_path(sf, CACHE_FILE.format(object_name))
+
+
+def _read(sf, object_name):
+    try:
+        with open(_path(sf, object_name), encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return entry if entry.get("version") == SLIM_VERSION else None
+
+
+def _write(sf, object_name, entry):
+    path = _path(sf, object_name)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+    os.replace(path + ".tmp", path)
+
+
+def describe(sf, object_name):
+    """describe() of an object, from memory, disk or Salesforce (revalidated after FRESH_SECONDS)"""
+    key = (local_store.org_key(sf), object_name)
+    with _lock:
+        entry = _memory.get(key)
+        if entry and time.time() - entry["checked"] < FRESH_SECONDS:
+            _stats["memory"] += 1
+            return entry["describe"]
+
+    if entry is None:
+        entry = _read(sf, object_name)
+        if entry and time.time() - entry["checked"] < FRESH_SECONDS:
+            with _lock:
+                _memory[key] = entry
+                _stats["disk"] += 1
+            return entry["describe"]
+
+    now = time.time()
+    headers = {"If-Modified-Since": entry["modified"]} if entry else None
+    try:
+        result = getattr(sf, object_name).describe(headers=headers)
+        entry = {"describe": _slim(result), "modified": formatdate(now, usegmt=True), "version": SLIM_VERSION}
+        counter = "fetched"
+    except SalesforceGeneralError as e:
+        if not entry or e.status != 304:
+            raise
+        counter = "not_modified"
+    entry["checked"] = now
+    _write(sf, object_name, entry)
+    with _lock:
+        _memory[key] = entry
+        _stats[counter] += 1
+    return entry["describe"]
+
+
+def fields_by_name(sf, object_name):
+    """{API name: field describe} of an object"""
+    return {f["name"]: f for f in describe(sf, object_name)["fields"]}
+
+
+def cache_stats():
+    """How describes were served: from memory/disk without a call, a 304 revalidation, or a full fetch"""
+    with _lock:
+        stats = dict(_stats)
+    served = sum(stats.values())
+    stats["no_call_rate"] = (stats["memory"] + stats["disk"]) / served if served else 0.0
+    return stats
@@ -0,0 +1,68 @@
+import pandas as pd
+
+# ------------------- UPLOAD FILE READER -------------------
+# Uploaded CSV/XLSX files are read in fixed-size row chunks so peak memory
+# depends on CHUNK_ROWS rather than on the size of the file, and callers
+# can start inserting before the whole file has been parsed.
+
+CHUNK_ROWS = 5000
+
+
+def _is_csv(file):
+    return file.name.lower().endswith(".csv")
+
+
+def _iter_xlsx_rows(file):
+    """Yield the header and then every row of the first sheet, without loading the workbook"""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(file, read_only=True, data_only=True)
+    try:
+        yield from wb.worksheets[0].iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def iter_upload_chunks(file, chunk_rows=CHUNK_ROWS):
+    """Yield the uploaded file as DataFrames of at most `chunk_rows` rows (column names stripped).
+
+    The index of every chunk is the row's position in the file (0 = first data row).
+    """
+    file.seek(0)
+    if _is_csv(file):
+        with pd.read_csv(file, chunksize=chunk_rows) as reader:
+            for chunk in reader:
+                chunk.columns = chunk.columns.str.strip()
+                yield chunk
+        return
+
+    rows = _iter_xlsx_rows(file)
+    header = next(rows, None)
+    if header is None:
+        return
+    columns = [str(c).strip() if c is not None else "" for c in header]
+    buffer = []
+    start = 0
+    for row in rows:
+        buffer.append(row)
+        if len(buffer) >= chunk_rows:
+            yield pd.DataFrame(buffer, columns=columns, index=range(start, start + len(buffer)))
+            start += len(buffer)
+            buffer = []
+    if buffer:
+        yield pd.DataFrame(buffer, columns=columns, index=range(start, start + len(buffer)))
+
+
+def read_upload_preview(file, rows=5):
+    """First few rows of the uploaded file, for display"""
+    chunks = iter_upload_chunks(file, chunk_rows=rows)
+    try:
+        return next(chunks, pd.DataFrame())
+    finally:
+        chunks.close()
+
+
+def frame_to_records(df):
+    """DataFrame rows as insert payloads, leaving out blank cells (NaN is not valid JSON)"""
+    clean = df.astype(object).where(df.notna(), None)
+    return [{k: v for k, v in rec.items() if v is not None} for rec in clean.to_dict(orient="records")]
@@ -0,0 +1,187 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import account_index
+import dedup
+import record_frame
+
+# ------------------- FUZZY DUPLICATE MATCHING -------------------
+# Exact key matching misses "ACME, Inc." vs "Acme Inc". Names are first
+# normalized (accents, case, punctuation and legal suffixes such as Inc,
+# Ltd or Pvt Ltd removed), then compared by their character trigrams.
+# Comparing every uploaded name with every existing one is out of reach
+# for a million records, so each name gets a MinHash signature and
+# locality-sensitive hashing (BANDS bands of ROWS_PER_BAND hashes) only
+# pairs names that share a whole band. The signatures of the candidate
+# pairs are compared with numpy, and the best pair of each row is then
+# scored exactly (trigram Jaccard similarity) for the review list.
+
+REVIEW_SCORE = float(os.environ.get("SFDC_FUZZY_SCORE", "0.75"))
+MAX_CHARS = 40               # longer names are compared on their first MAX_CHARS characters
+BANDS = 8
+ROWS_PER_BAND = 3
+# A bucket shared by more names than this (e.g. only a common word) pairs
+# each row with its first MAX_BUCKET names only
+MAX_BUCKET = 50
+SIGNATURE_ROWS = 50_000      # rows hashed per numpy pass
+MATCH_ROWS = 5_000           # uploaded rows matched per numpy pass
+# The signature estimate is rough; pairs this far below REVIEW_SCORE are still scored exactly
+ESTIMATE_SLACK = 0.15
+
+LEGAL_SUFFIXES = ["inc", "incorporated", "corp", "corporation", "co", "company", "llc", "llp", "lp", "ltd",
+                  "limited", "plc", "gmbh", "ag", "sa", "srl", "bv", "nv", "pty", "pvt", "private", "pte"]
+_SUFFIX_RE = r"(?:\s+(?:%s))+$" % "|".join(LEGAL_SUFFIXES)
+
+_rng = np.random.default_rng(20240601)
+_MULTIPLIERS = (_rng.integers(1, 2 ** 31, BANDS * ROWS_PER_BAND, dtype=np.uint32) * 2 + 1).astype(np.uint32)
+_OFFSETS = _rng.integers(0, 2 ** 32, BANDS * ROWS_PER_BAND, dtype=np.uint32)
+
+
+def normalize(names):
+    """Comparable form of each name: "ACME, Inc." and "Acme Inc" both become "acme" """
+    text = names.fillna("").astype(str).str.normalize("NFKD").str.encode("ascii", "ignore").str.decode("ascii")
+    text = text.str.lower().str.replace("&", " and ", regex=False).str.replace(r"[.'`]", "", regex=True)
+    text = text.str.replace(r"[^a-z0-9]+", " ", regex=True).str.strip()
+    text = text.str.replace(r"^the\s+", "", regex=True)
+    stripped = text.str.replace(_SUFFIX_RE, "", regex=True)
+    # A name that is nothing but a suffix ("Company") keeps it
+    return stripped.where(stripped != "", text)
+
+
+def fuzzy_keys(df, fields):
+    """Normalized fields of each row joined by a space (missing columns count as blank)"""
+    parts = [normalize(df[f]) if f in df.columns else pd.Series("", index=df.index) for f in fields]
+    return parts[0].str.cat(parts[1:], sep=" ").str.strip() if len(parts) > 1 else parts[0]
+
+
+def _display(df, fields):
+    """The fields of each row as one readable string"""
+    parts = [df[f].fillna("").astype(str) if f in df.columns else pd.Series("", index=df.index) for f in fields]
+    return (parts[0].str.cat(parts[1:], sep=" ") if len(parts) > 1 else parts[0]).str.strip()
+
+
+def signatures(keys):
+    """MinHash signature (uint32 per hash) of each key's character trigrams; all-max for blank keys"""
+    keys = np.asarray(keys, dtype=object)
+    sigs = np.empty((len(keys), len(_MULTIPLIERS)), dtype=np.uint32)
+    for start in range(0, len(keys), SIGNATURE_ROWS):
+        part = keys[start:start + SIGNATURE_ROWS]
+        padded = np.array([f" {k[:MAX_CHARS]} " if k else "" for k in part], dtype=f"S{MAX_CHARS + 2}")
+        chars = padded.view(np.uint8).reshape(len(part), MAX_CHARS + 2).astype(np.uint32)
+        grams = chars[:, :-2] | (chars[:, 1:-1] << 8) | (chars[:, 2:] << 16)
+        blank = chars[:, 2:] == 0
+        for j, (a, b) in enumerate(zip(_MULTIPLIERS, _OFFSETS)):
+            hashed = grams * a + b
+            hashed[blank] = np.iinfo(np.uint32).max
+            sigs[start:start + len(part), j] = hashed.min(axis=1)
+    return sigs
+
+
+def _band_keys(sigs):
+    """One uint64 bucket key per (row, band)"""
+    bands = sigs.reshape(len(sigs), BANDS, ROWS_PER_BAND).astype(np.uint64)
+    keys = np.zeros((len(sigs), BANDS), dtype=np.uint64)
+    for r in range(ROWS_PER_BAND):
+        keys = keys * np.uint64(0x9E3779B97F4A7C15) + bands[:, :, r]
+    return keys
+
+
+def build_index(ids, names, keys):
+    """Candidate index over existing records: `keys` are their fuzzy_keys, `names` what the review shows"""
+    keys = np.asarray(keys, dtype=object)
+    keep = keys != ""
+    ids, names, keys = np.asarray(ids, dtype=object)[keep], np.asarray(names, dtype=object)[keep], keys[keep]
+    sigs = signatures(keys)
+    bands = []
+    for band in _band_keys(sigs).T:
+        order = np.argsort(band, kind="stable")
+        bands.append((band[order], order))
+    return {"ids": ids, "names": names, "keys": keys, "sigs": sigs, "bands": bands}
+
+
+def _trigrams(key):
+    key = f" {key[:MAX_CHARS]} "
+    return {key[i:i + 3] for i in range(len(key) - 2)}
+
+
+def similarity(a, b):
+    """Exact trigram Jaccard similarity of two fuzzy keys"""
+    x, y = _trigrams(a), _trigrams(b)
+    return len(x & y) / len(x | y) if x or y else 0.0
+
+
+def _best_candidates(index, sigs):
+    """(row positions, index positions, estimated similarity) of each row's best candidate"""
+    rows, found = [], []
+    for band, (sorted_keys, order) in zip(_band_keys(sigs).T, index["bands"]):
+        lo = np.searchsorted(sorted_keys, band, side="left")
+        counts = np.minimum(np.searchsorted(sorted_keys, band, side="right") - lo, MAX_BUCKET)
+        row = np.repeat(np.arange(len(band)), counts)
+        step = np.arange(len(row)) - np.repeat(np.cumsum(counts) - counts, counts)
+        rows.append(row)
+        found.append(order[lo[row] + step])
+    rows, found = np.concatenate(rows), np.concatenate(found)
+    if not len(rows):
+        return rows, found, np.empty(0)
+    estimate = (sigs[rows] == index["sigs"][found]).mean(axis=1)
+    best = np.lexsort((-estimate, rows))
+    first = best[np.r_[True, rows[best][1:] != rows[best][:-1]]]
+    return rows[first], found[first], estimate[first]
+
+
+def match(index, keys, threshold=REVIEW_SCORE):
+    """Best existing match of each key scoring at least `threshold`: DataFrame indexed by key
+    position with match_id, match_name and score"""
+    keys = np.asarray(keys, dtype=object)
+    out = []
+    for start in range(0, len(keys), MATCH_ROWS):
+        part = keys[start:start + MATCH_ROWS]
+        rows, found, estimate = _best_candidates(index, signatures(part))
+        close = estimate >= threshold - ESTIMATE_SLACK
+        for row, pos in zip(rows[close], found[close]):
+            if not part[row]:
+                continue
+            score = similarity(part[row], index["keys"][pos])
+            if score >= threshold:
+                out.append((start + row, index["ids"][pos], index["names"][pos], round(score, 3)))
+    return pd.DataFrame(out, columns=["position", "match_id", "match_name", "score"]).set_index("position")
+
+
+def existing_records(sf, spec):
+    """(ids, display names, fuzzy keys, exact key hashes) of the object's records; Accounts come
+    from the local Account index"""
+    fields = spec["fuzzy_fields"]
+    if spec["dedup"] == "index":
+        account_index.sync_account_index(sf)
+        frame = pd.DataFrame(account_index.all_names(sf), columns=["Id", "Name"])
+    else:
+        columns = ["Id"] + list(dict.fromkeys(fields + spec["key_fields"]))
+        frame = record_frame.to_frame(sf.query_all_iter(f"SELECT {', '.join(columns)} FROM {spec['object']}"),
+                                      columns)
+    names = _display(frame, fields)
+    exact = np.unique(dedup.hash_keys(dedup.build_keys(frame, spec["key_fields"])))
+    return frame["Id"].to_numpy(dtype=object), names.to_numpy(dtype=object), fuzzy_keys(frame, fields), exact
+
+
+def likely_duplicates(sf, spec, chunks, threshold=REVIEW_SCORE):
+    """Upload rows that are not exact duplicates but closely match an existing record, for review.
+
+    Returns a DataFrame indexed by file row with the uploaded name, the
+    matched record's Id and name, and the similarity score (1.0 = same
+    name once normalized), best scores first.
+    """
+    ids, names, keys, exact = existing_records(sf, spec)
+    index = build_index(ids, names, keys)
+    found = []
+    for chunk in chunks:
+        chunk = chunk[~dedup.is_existing(dedup.hash_keys(dedup.build_keys(chunk, spec["key_fields"])), exact)]
+        matches = match(index, fuzzy_keys(chunk, spec["fuzzy_fields"]).to_numpy(dtype=object), threshold)
+        if len(matches):
+            matches.index = chunk.index[matches.index]
+            matches.insert(0, "name", _display(chunk.loc[matches.index], spec["fuzzy_fields"]))
+            found.append(matches)
+    if not found:
+        return pd.DataFrame(columns=["name", "match_id", "match_name", "score"])
+    return pd.concat(found).sort_values("score", ascending=False, kind="stable")
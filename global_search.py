@@ -0,0 +1,119 @@
+import re
+
+import streamlit as st
+
+import object_engine
+import object_specs
+import search_cache
+
+# ------------------- GLOBAL SEARCH -------------------
+# One SOSL call (FIND ... RETURNING Account(...), Contact(...), ...) looks
+# a term up in all four objects through Salesforce's search index, instead
+# of a LIKE '%term%' query per object, which scans the whole table. Results
+# are grouped per object with a per-object limit, and any record can be
+# opened in its object's edit form.
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 200              # SOSL returns at most 2,000 records per call
+MIN_TERM_CHARS = 2           # SOSL rejects shorter search terms
+_RESERVED = re.compile(r"""([?&|!{}\[\]()^~*:\\"'+-])""")
+
+
+def sosl_term(term):
+    """Search text for FIND {...}: reserved characters escaped, every word matched as a prefix"""
+    return " ".join(_RESERVED.sub(r"\\\1", word) + "*" for word in term.split())
+
+
+def returning(spec, limit):
+    return f"{spec['object']}({object_engine.select_fields(spec)} LIMIT {int(limit)})"
+
+
+def fetch(sf, specs, term, limit=DEFAULT_LIMIT):
+    """Records matching `term` in each spec's object, in one SOSL call: {"records": [...]} where each
+    record's attributes.type is its object"""
+    query = (f"FIND {{{sosl_term(term)}}} IN ALL FIELDS RETURNING "
+             + ", ".join(returning(spec, limit) for spec in specs))
+    result = sf.search(query) or {}
+    return {"records": result.get("searchRecords", [])}
+
+
+def search_all(sf, specs, term, limit=DEFAULT_LIMIT, on_wait=None):
+    """Cached global search; returns {object: [records]} in the order of `specs`"""
+    objects = tuple(spec["object"] for spec in specs)
+    result = search_cache.cached_search(search_cache.scope_for(sf), search_cache.ALL_OBJECTS, term,
+                                        lambda normalized: fetch(sf, specs, normalized, limit),
+                                        page=(objects, limit), on_wait=on_wait)
+    groups = {obj: [] for obj in objects}
+    for record in result["records"]:
+        groups.setdefault(record["attributes"]["type"], []).append(record)
+    return groups
+
+
+def _open_record(obj, record_id):
+    """Button callback: switch the page to the object and open the record in its edit form"""
+    st.session_state["object_choice"] = obj
+    st.session_state[f"{obj}_search_input"] = ""
+    st.session_state[object_engine.open_record_key(obj)] = record_id
+
+
+def _results(spec, records, limit):
+    obj = spec["object"]
+    more = "+" if len(records) >= limit else ""
+    st.markdown(f"<h4 style='color: {spec['color']};'>{spec['icon']} {spec['plural']} ({len(records)}{more})</h4>",
+                unsafe_allow_html=True)
+    if not records:
+        st.caption("No matches.")
+        return
+    st.dataframe(object_engine.list_frame(spec, records), use_container_width=True)
+    options = [object_engine.option_label(spec, r) for r in records]
+    col_pick, col_open = st.columns([3, 1])
+    with col_pick:
+        chosen = st.selectbox(f"{obj} to open", range(len(records)), format_func=lambda i: options[i],
+                              key=f"global_{obj}_selected", label_visibility="collapsed")
+    with col_open:
+        st.button(f"✏️ Open in {obj}", key=f"global_{obj}_open", use_container_width=True,
+                  on_click=_open_record, args=(obj, records[chosen]["Id"]))
+
+
+def run():
+    st.markdown("<h3 style='color: teal;'>🔎 Search All Objects</h3>", unsafe_allow_html=True)
+    st.write("Find a name, email, phone or company in Accounts, Contacts, Opportunities and Leads at once.")
+
+    sf = st.session_state.sf_connection
+    col_term, col_objects, col_limit = st.columns([3, 3, 1])
+    with col_term:
+        term = st.text_input("Search for", key="global_search_input")
+    with col_objects:
+        chosen = st.multiselect("In", list(object_specs.SPECS), default=list(object_specs.SPECS),
+                                key="global_search_objects")
+    with col_limit:
+        limit = int(st.number_input("Per object", min_value=1, max_value=MAX_LIMIT, value=DEFAULT_LIMIT,
+                                    key="global_search_limit"))
+    if not term or not chosen:
+        return
+    if len(term.strip().replace("*", "")) < MIN_TERM_CHARS:
+        st.warning(f"⚠️ Enter at least {MIN_TERM_CHARS} characters.")
+        return
+
+    specs = []
+    for obj in chosen:
+        try:
+            specs.append(object_specs.live(sf, object_specs.SPECS[obj]))
+        except Exception:
+            specs.append(object_specs.SPECS[obj])
+    status, on_wait = object_engine.searching_indicator()
+    try:
+        groups = search_all(sf, specs, term, limit, on_wait=on_wait)
+    except Exception as e:
+        st.error(f"❌ Salesforce Search Error: {e}")
+        return
+    finally:
+        status.empty()
+
+    total = sum(len(records) for records in groups.values())
+    if not total:
+        st.warning("⚠️ No records found.")
+        return
+    st.success(f"✅ Found {total} record(s)")
+    for spec in specs:
+        _results(spec, groups.get(spec["object"], []), limit)
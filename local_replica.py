@@ -0,0 +1,283 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import delta_sync
+import local_store
+import sf_session
+
+# ------------------- LOCAL READ REPLICA -------------------
+# Optional (SFDC_LOCAL_REPLICA=1) SQLite copy of the records the object
+# pages show, so searches answer in milliseconds without an API call.
+# Each object gets a full load the first time, then a background thread
+# re-syncs every SYNC_SECONDS with a SystemModstamp delta query plus the
+# getDeleted resource (delta_sync, shared with the Account key index). The
+# search fields get an FTS5 trigram index, which serves LIKE '%term%'
+# substring matches from the index. Searches fall back to Salesforce
+# while a replica is being built or is more than MAX_AGE_SECONDS old.
+#
+# Query results depend on the user's sharing rules, so every logged-in
+# user gets a replica of their own (one file per org and username), synced
+# with their own connection and only ever searched for them. That costs
+# one full load and one sync thread per user: for deployments with many
+# users leave the replica off. A sync thread that fails MAX_FAILED_ROUNDS
+# rounds in a row (e.g. the password changed) stops; the user's next page
+# visit starts a new one with the connection of that visit.
+
+ENABLED = os.environ.get("SFDC_LOCAL_REPLICA", "") == "1"
+REPLICA_FILE = "replica.sqlite3"
+SYNC_SECONDS = int(os.environ.get("SFDC_REPLICA_SYNC", "60"))
+MAX_AGE_SECONDS = 3 * SYNC_SECONDS
+MIN_INDEXED_CHARS = 3        # the trigram index needs three characters; shorter terms scan the table
+MAX_FAILED_ROUNDS = 3
+
+_lock = threading.Lock()
+_object_locks = {}           # (org, user, object) -> lock held while that table syncs
+_schedulers = {}             # (org, user) -> sync thread
+_connections = {}            # (org, user) -> the user's latest connection, used by the sync thread
+_status = {}                 # (org, user, object) -> {"synced", "rows", "mode", "error"}
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _owner(sf):
+    """(org, user) a replica belongs to"""
+    return local_store.org_key(sf), sf_session.username_of(sf)
+
+
+def _connect(sf):
+    user = re.sub(r"[^A-Za-z0-9_.@-]", "_", _owner(sf)[1])
+    filename = f"replica-{user}.sqlite3" if user else REPLICA_FILE
+    conn = sqlite3.connect(local_store.org_path(sf, filename), timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS sync_state (object TEXT PRIMARY KEY, columns TEXT, "
+                 "last_sync TEXT, last_modstamp TEXT)")
+    return conn
+
+
+def _state(conn, object_name):
+    row = conn.execute("SELECT columns, last_sync, last_modstamp FROM sync_state WHERE object = ?",
+                       (object_name,)).fetchone()
+    if row is None:
+        return None
+    return {"columns": json.loads(row[0]), "last_sync": datetime.fromisoformat(row[1]) if row[1] else None,
+            "last_modstamp": datetime.fromisoformat(row[2]) if row[2] else None}
+
+
+def _create_table(conn, object_name, fields, search_fields):
+    """(Re)create an object's table, its FTS5 index and the triggers keeping the index current"""
+    table, fts = _quote(object_name), _quote(object_name + "_fts")
+    columns = [f for f in fields if f != "Id"]
+    indexed = ", ".join(_quote(f) for f in search_fields)
+    new_values = ", ".join(f"new.{_quote(f)}" for f in search_fields)
+    old_values = ", ".join(f"old.{_quote(f)}" for f in search_fields)
+    conn.executescript(f"""
+        DROP TABLE IF EXISTS {fts};
+        DROP TABLE IF EXISTS {table};
+        CREATE TABLE {table} (Id TEXT PRIMARY KEY, {", ".join(_quote(c) for c in columns)}, SystemModstamp TEXT);
+        CREATE VIRTUAL TABLE {fts} USING fts5({indexed}, content={table}, tokenize='trigram');
+        CREATE TRIGGER {_quote(object_name + "_ai")} AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts} (rowid, {indexed}) VALUES (new.rowid, {new_values});
+        END;
+        CREATE TRIGGER {_quote(object_name + "_ad")} AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts} ({fts}, rowid, {indexed}) VALUES ('delete', old.rowid, {old_values});
+        END;
+        CREATE TRIGGER {_quote(object_name + "_au")} AFTER UPDATE ON {table} BEGIN
+            INSERT INTO {fts} ({fts}, rowid, {indexed}) VALUES ('delete', old.rowid, {old_values});
+            INSERT INTO {fts} (rowid, {indexed}) VALUES (new.rowid, {new_values});
+        END;
+    """)
+
+
+def _flat(record, field):
+    """Value of a field of a query record; "Account.Name" reads the nested parent"""
+    if "." not in field:
+        return record.get(field)
+    relation, name = field.split(".", 1)
+    parent = record.get(relation) or {}
+    return parent.get(name) if isinstance(parent, dict) else None
+
+
+def _nested(object_name, row):
+    """A replica row back in the shape of a query record"""
+    record = {"attributes": {"type": object_name}}
+    for field, value in row.items():
+        if "." in field:
+            relation, name = field.split(".", 1)
+            if value is not None:
+                record.setdefault(relation, {"attributes": {"type": relation}})[name] = value
+            else:
+                record.setdefault(relation, None)
+        elif field != "SystemModstamp":
+            record[field] = value
+    return record
+
+
+def _upsert(conn, object_name, fields, records):
+    """Write query records into the replica; returns (row count, newest SystemModstamp)"""
+    columns = list(dict.fromkeys(["Id"] + fields + ["SystemModstamp"]))
+    statement = (f"INSERT INTO {_quote(object_name)} ({', '.join(_quote(c) for c in columns)}) "
+                 f"VALUES ({', '.join('?' * len(columns))}) ON CONFLICT (Id) DO UPDATE SET "
+                 + ", ".join(f"{_quote(c)} = excluded.{_quote(c)}" for c in columns[1:]))
+    return delta_sync.write_records(conn, statement, records, lambda record: [_flat(record, c) for c in columns])
+
+
+def _object_lock(key):
+    with _lock:
+        return _object_locks.setdefault(key, threading.Lock())
+
+
+def sync(sf, object_name, fields, search_fields, rebuild=False):
+    """Bring one object's replica up to date (a full load the first time or when its fields changed)"""
+    key = _owner(sf) + (object_name,)
+    fields = list(dict.fromkeys(["Id"] + fields))
+    select = f"SELECT {', '.join(fields + ['SystemModstamp'])} FROM {object_name}"
+    with _object_lock(key):
+        conn = _connect(sf)
+        try:
+            state = _state(conn, object_name) or {"columns": None, "last_sync": None, "last_modstamp": None}
+            result = delta_sync.sync(
+                sf, object_name, select, state["last_sync"], state["last_modstamp"],
+                clear=lambda: _create_table(conn, object_name, fields, search_fields),
+                write=lambda records: _upsert(conn, object_name, fields, records),
+                delete=lambda ids: conn.executemany(f"DELETE FROM {_quote(object_name)} WHERE Id = ?",
+                                                    [(i,) for i in ids]),
+                rebuild=rebuild or state["columns"] != [fields, search_fields])
+            newest = result["last_modstamp"]
+            conn.execute("INSERT OR REPLACE INTO sync_state (object, columns, last_sync, last_modstamp) "
+                         "VALUES (?, ?, ?, ?)", (object_name, json.dumps([fields, search_fields]),
+                                                 result["last_sync"].isoformat(),
+                                                 newest.isoformat() if newest else None))
+            conn.commit()
+            rows = conn.execute(f"SELECT COUNT(*) FROM {_quote(object_name)}").fetchone()[0]
+        finally:
+            conn.close()
+    with _lock:
+        _status[key] = {"synced": time.time(), "rows": rows, "mode": result["mode"], "error": None}
+    return {"mode": result["mode"], "upserted": result["upserted"], "deleted": result["deleted"], "total": rows}
+
+
+def _loop(owner, tables):
+    failed_rounds = 0
+    while failed_rounds < MAX_FAILED_ROUNDS:
+        with _lock:
+            sf = _connections[owner]
+        failed = False
+        try:
+            replicated = tables()
+        except Exception:
+            replicated, failed = [], True
+        for object_name, fields, search_fields in replicated:
+            try:
+                sync(sf, object_name, fields, search_fields)
+            except Exception as e:
+                failed = True
+                with _lock:
+                    entry = _status.setdefault(owner + (object_name,), {"synced": None, "rows": 0})
+                    entry.update(error=str(e))
+        failed_rounds = failed_rounds + 1 if failed else 0
+        time.sleep(SYNC_SECONDS)
+    with _lock:
+        del _schedulers[owner]
+
+
+def start(sf, tables):
+    """Keep the user's replica in sync in the background (one thread per org and user, if the
+    replica is enabled). The thread syncs with the latest connection passed here.
+
+    `tables()` returns (object, fields, search fields) for every replicated object.
+    """
+    if not ENABLED:
+        return
+    owner = _owner(sf)
+    with _lock:
+        _connections[owner] = sf
+        if owner in _schedulers:
+            return
+        thread = _schedulers[owner] = threading.Thread(target=_loop, args=(owner, tables), daemon=True,
+                                                       name=f"replica-{owner[0]}-{owner[1]}")
+    thread.start()
+
+
+def is_fresh(sf, object_name):
+    with _lock:
+        entry = _status.get(_owner(sf) + (object_name,))
+    return bool(entry and entry["synced"] and time.time() - entry["synced"] <= MAX_AGE_SECONDS)
+
+
+def search(sf, object_name, fields, search_fields, term, after_id=None, page_size=50):
+    """A search page answered from the replica, in the shape of pagination.fetch_page, or None when
+    the replica cannot answer (disabled, not synced recently, or built with other fields)"""
+    if not ENABLED or not is_fresh(sf, object_name):
+        return None
+    fields = list(dict.fromkeys(["Id"] + fields))
+    conn = _connect(sf)
+    try:
+        state = _state(conn, object_name)
+        if state is None or state["columns"] != [fields, search_fields]:
+            return None
+        table = _quote(object_name)
+        if len(term) >= MIN_INDEXED_CHARS:
+            phrase = '"' + term.replace('"', '""') + '"'
+            match = (f"rowid IN (SELECT rowid FROM {_quote(object_name + '_fts')} WHERE "
+                     f"{_quote(object_name + '_fts')} MATCH ?)")
+            params = ["{" + " ".join(_quote(f) for f in search_fields) + "} : " + phrase]
+        else:
+            pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            match = "(" + " OR ".join(f"{_quote(f)} LIKE ? ESCAPE '\\'" for f in search_fields) + ")"
+            params = [pattern] * len(search_fields)
+        where = match + (" AND Id > ?" if after_id else "")
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(f"SELECT {', '.join(_quote(f) for f in fields)} FROM {table} WHERE {where} "
+                            f"ORDER BY Id LIMIT ?", params + ([after_id] if after_id else []) + [page_size + 1]
+                            ).fetchall()
+        page = {"records": [_nested(object_name, dict(r)) for r in rows[:page_size]],
+                "has_more": len(rows) > page_size}
+        if after_id is None:
+            page["total"] = conn.execute(f"SELECT COUNT(*) FROM {table} WHERE {match}", params).fetchone()[0]
+        return page
+    finally:
+        conn.close()
+
+
+def refresh(sf, object_name, fields, record_id):
+    """Re-read one record after the app wrote it (drops it if it is gone)"""
+    if not ENABLED or not is_fresh(sf, object_name):
+        return
+    fields = list(dict.fromkeys(["Id"] + fields))
+    records = sf.query(f"SELECT {', '.join(fields + ['SystemModstamp'])} FROM {object_name} "
+                       f"WHERE Id = '{record_id}'")["records"]
+    conn = _connect(sf)
+    try:
+        state = _state(conn, object_name)
+        if state is None or state["columns"][0] != fields:
+            return
+        with conn:
+            if records:
+                _upsert(conn, object_name, fields, records)
+            else:
+                conn.execute(f"DELETE FROM {_quote(object_name)} WHERE Id = ?", (record_id,))
+    finally:
+        conn.close()
+
+
+def invalidate(sf, object_name):
+    """Send searches to Salesforce until the next sync, e.g. after a bulk load"""
+    with _lock:
+        entry = _status.get(_owner(sf) + (object_name,))
+        if entry:
+            entry["synced"] = None
+
+
+def status(sf):
+    """{object: {"synced", "rows", "mode", "error"}} of the user's replica"""
+    owner = _owner(sf)
+    with _lock:
+        return {key[2]: dict(entry) for key, entry in _status.items() if key[:2] == owner}
@@ -0,0 +1,25 @@
+import os
+import re
+
+# ------------------- LOCAL STORE -------------------
+# On-disk caches (key indexes, journals, ...) live under one directory,
+# with one sub-folder per Salesforce org so two orgs never share data.
+CACHE_DIR = os.environ.get("SFDC_CACHE_DIR", ".sfdc_cache")
+
+
+def store_path(filename):
+    """Path of a cache file shared by all orgs"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return os.path.join(CACHE_DIR, filename)
+
+
+def org_key(sf):
+    """Filesystem-safe identifier of the org behind a Salesforce connection"""
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", sf.sf_instance or "default")
+
+
+def org_path(sf, filename):
+    """Path of a cache file for the org behind `sf` (folder is created on demand)"""
+    folder = os.path.join(CACHE_DIR, org_key(sf))
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, filename)
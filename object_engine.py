@@ -0,0 +1,874 @@
+import os
+import time
+from datetime import date
+
+import pandas as pd
+import streamlit as st
+
+import account_index
+import account_lookup
+import bulk_dispatch
+import bulk_ingest
+import dedup
+import dedup_planner
+import file_reader
+import fuzzy_match
+import local_replica
+import object_specs
+import pagination
+import record_frame
+import search_cache
+import update_stats
+import upload_jobs
+import upload_journal
+
+# ------------------- GENERIC OBJECT ENGINE -------------------
+# One implementation of search, create/update/delete, the record form and
+# bulk upload for every object, driven by the specs in object_specs.
+# Keyset paging, the search cache, the optional local read replica, the
+# shared Account lookup, concurrent bulk batches and vectorized duplicate
+# checks live here once, so every configured or described object gets them.
+# Updates from the edit form send only the fields that changed.
+
+
+# ------------------- SPEC HELPERS -------------------
+def field_names(spec):
+    return [f["name"] for f in spec["fields"]]
+
+
+def _field_map(spec):
+    return {f["name"]: f for f in spec["fields"]}
+
+
+def _lookups(spec):
+    return [f for f in spec["fields"] if f["type"] == "lookup"]
+
+
+def select_fields(spec):
+    """SOQL field list: Id, the spec fields and the Name of each lookup's parent"""
+    names = ["Id"] + field_names(spec) + spec["search_fields"] + spec["list_fields"]
+    names += [f"{f['relationship']}.Name" for f in _lookups(spec)]
+    return ", ".join(dict.fromkeys(names))
+
+
+def lookup_name(record, field):
+    parent = record.get(field["relationship"]) or {}
+    return parent.get("Name", "") if isinstance(parent, dict) else ""
+
+
+def list_frame(spec, records):
+    """The list_fields of records under their labels (a lookup shows its parent's Name)"""
+    fields = _field_map(spec)
+    names = [f"{fields[n]['relationship']}.Name" if n in fields and fields[n]["type"] == "lookup" else n
+             for n in spec["list_fields"]]
+    frame = record_frame.to_frame(records, names, spec)
+    frame.columns = [fields[n]["label"] if n in fields else n for n in spec["list_fields"]]
+    return frame
+
+
+class _Blank(dict):
+    def __missing__(self, key):
+        return ""
+
+
+def option_label(spec, record):
+    """Text shown for a record in the "select record to edit" box"""
+    return spec["option_label"].format_map(_Blank({k: v for k, v in record.items() if v is not None}))
+
+
+def missing_required(spec, values, updating=False):
+    """Labels of required fields left empty; an update skips read-only fields, which its form leaves out"""
+    return [f["label"] for f in spec["fields"] if f.get("required") and not (updating and f.get("read_only"))
+            and values.get(f["name"]) in ("", None)]
+
+
+# ------------------- DATA ACCESS -------------------
+def fetch_page(sf, spec, term, after_id=None):
+    """One page of records where any search field contains `term`"""
+    escaped = pagination.soql_escape(term)
+    where = " OR ".join(f"{name} LIKE '%{escaped}%'" for name in spec["search_fields"])
+    return pagination.fetch_page(sf, select_fields(spec), spec["object"], where, after_id=after_id)
+
+
+def replica_tables(sf):
+    """(object, select fields, search fields) of each configured object, for local_replica.start()"""
+    tables = []
+    for spec in object_specs.SPECS.values():
+        try:
+            spec = object_specs.live(sf, spec)
+        except Exception:
+            pass
+        tables.append((spec["object"], select_fields(spec).split(", "), spec["search_fields"]))
+    return tables
+
+
+def fetch_record(sf, spec, record_id):
+    """One record by Id with the search fields, as a search page (no records if it is gone)"""
+    where = f"Id = '{pagination.soql_escape(record_id)}'"
+    return {"records": sf.query(f"SELECT {select_fields(spec)} FROM {spec['object']} WHERE {where}")["records"],
+            "has_more": False}
+
+
+def search(sf, spec, term, after_id=None, on_wait=None):
+    """Cached page of search results (query errors are raised); see search_cache for `on_wait`.
+    Answered from the local replica instead when it is enabled and in sync"""
+    page = local_replica.search(sf, spec["object"], select_fields(spec).split(", "), spec["search_fields"],
+                                search_cache.normalize_term(term), after_id, pagination.PAGE_SIZE)
+    if page is not None:
+        return page
+    return search_cache.cached_search(search_cache.scope_for(sf), spec["object"], term,
+                                      lambda normalized: fetch_page(sf, spec, normalized, after_id),
+                                      page=(after_id, pagination.PAGE_SIZE), on_wait=on_wait)
+
+
+def _payload(spec, values, creating):
+    data = {}
+    for f in spec["fields"]:
+        if f["name"] not in values or (f.get("read_only") and not creating):
+            continue
+        value = values[f["name"]]
+        if value in ("", None):
+            # Nothing to send on create; on update an emptied field is cleared
+            if creating:
+                continue
+            value = None
+        data[f["name"]] = value
+    return data
+
+
+def form_value(field, record):
+    """What the edit form's widget for `field` starts with for `record`, i.e. what it submits untouched"""
+    value = record.get(field["name"])
+    kind = field["type"]
+    if kind == "picklist":
+        if value:
+            return value
+        return "" if not field.get("required") or not field["options"] else field["options"][0]
+    if kind == "number":
+        return float(value or 0)
+    if kind == "int":
+        return int(value or 0)
+    if kind == "checkbox":
+        return bool(value)
+    if kind == "date":
+        return str(pd.to_datetime(value).date() if value else date.today())
+    if kind == "lookup":
+        return value or ""
+    return "" if value is None else str(value)
+
+
+def changed_values(spec, values, original):
+    """The submitted `values` that differ from the form's starting values for the `original` record"""
+    fields = _field_map(spec)
+    return {name: value for name, value in values.items()
+            if name not in fields or value != form_value(fields[name], original)}
+
+
+def clear_dashboard(sf, spec):
+    """Drop the cached dashboard figures of the object, if it has a dashboard ("dashboard_cache");
+    aggregates hold no record ids or terms for search_cache.invalidate() to match"""
+    if spec.get("dashboard_cache"):
+        search_cache.clear(search_cache.scope_for(sf), spec["dashboard_cache"])
+
+
+def save_record(sf, spec, values, record_id=None, original=None):
+    """Create (no record_id) or update one record; returns (ok, error message).
+
+    With `original` (the record as loaded into the form), an update sends
+    only the changed fields, and no call at all when nothing changed.
+    """
+    try:
+        sobject = getattr(sf, spec["object"])
+        data = _payload(spec, values, creating=record_id is None)
+        if record_id and original is not None:
+            full, data = data, _payload(spec, changed_values(spec, values, original), creating=False)
+            update_stats.count_update(full, data)
+            if not data:
+                return True, None
+        if record_id:
+            sobject.update(record_id, data)
+        else:
+            record_id = sobject.create(data)["id"]
+        search_cache.invalidate(search_cache.scope_for(sf), spec["object"], record_id=record_id,
+                                texts=[values.get(name) for name in spec["search_fields"]])
+        clear_dashboard(sf, spec)
+        local_replica.refresh(sf, spec["object"], select_fields(spec).split(", "), record_id)
+        return True, None
+    except Exception as e:
+        return False, str(e)
+
+
+def delete_record(sf, spec, record_id):
+    """Delete one record; returns (ok, error message)"""
+    try:
+        getattr(sf, spec["object"]).delete(record_id)
+        search_cache.invalidate(search_cache.scope_for(sf), spec["object"], record_id=record_id)
+        clear_dashboard(sf, spec)
+        local_replica.refresh(sf, spec["object"], select_fields(spec).split(", "), record_id)
+        return True, None
+    except Exception as e:
+        return False, str(e)
+
+
+# ------------------- DUPLICATE CHECKS -------------------
+def existing_keys(sf, spec):
+    """What duplicate_mask compares against: sorted key hashes of all records (None for the Account index)"""
+    if spec["dedup"] == "index":
+        account_index.sync_account_index(sf)
+        return None
+    if not spec["key_fields"]:
+        return None
+    query = f"SELECT {', '.join(spec['key_fields'])} FROM {spec['object']}"
+    return dedup.existing_key_hashes(sf.query_all_iter(query), spec["key_fields"])
+
+
+def check_plan(sf, spec, read_chunks):
+    """Plan the duplicate check of an upload (see dedup_planner) and load what it compares against.
+
+    `read_chunks()` reads the upload from the start. Returns (existing, plan).
+    """
+    plan = dedup_planner.plan(sf, spec, read_chunks)
+    if plan["method"] == "probe":
+        existing = dedup_planner.probe(sf, spec, plan["field"], plan.pop("values"))
+    else:
+        existing = existing_keys(sf, spec)
+    return existing, plan
+
+
+def duplicate_mask(sf, spec, chunk, existing):
+    """Boolean mask of the upload rows that already exist in Salesforce"""
+    if spec["dedup"] == "index" and existing is None:
+        keys = chunk[spec["key_fields"][0]].str.strip().str.lower()
+        return keys.isin(account_index.existing_name_keys(sf, keys)).to_numpy()
+    if existing is None:
+        return pd.Series(False, index=chunk.index).to_numpy()
+    return dedup.is_existing(dedup.hash_keys(dedup.build_keys(chunk, spec["key_fields"])), existing)
+
+
+def count_duplicates(sf, spec, file):
+    """(total rows, rows that already exist, check plan) for an uploaded file"""
+    existing, plan = check_plan(sf, spec, lambda: file_reader.iter_upload_chunks(file))
+    total = 0
+    duplicates = 0
+    for chunk in file_reader.iter_upload_chunks(file):
+        total += len(chunk)
+        duplicates += int(duplicate_mask(sf, spec, chunk, existing).sum())
+    return total, duplicates, plan
+
+
+def describe_plan(plan):
+    """One line for the UI about how duplicates were checked"""
+    if plan["method"] == "probe":
+        return (f"🔎 Duplicates checked by looking up this file's {plan['field']} values "
+                f"({plan['calls']} queries) instead of reading all {plan['org_count']:,} records.")
+    if plan["method"] == "scan":
+        return f"🔎 Duplicates checked against all {plan['org_count']:,} existing records ({plan['calls']} pages)."
+    if plan["method"] == "index":
+        return "🔎 Duplicates checked against the local Account name index."
+    return "🔎 No duplicate check for this object."
+
+
+# ------------------- BULK UPLOAD -------------------
+def prepare_chunk(spec, chunk, keep=()):
+    """Keep the spec's columns (and `keep`), convert dates to YYYY-MM-DD and fill upload defaults"""
+    names = field_names(spec) + list(keep)
+    out = chunk[[c for c in chunk.columns if c in names]].copy()
+    for f in spec["fields"]:
+        if f["type"] == "date" and f["name"] in out.columns:
+            out[f["name"]] = pd.to_datetime(out[f["name"]], errors="coerce", dayfirst=True).dt.strftime("%Y-%m-%d")
+    for name, default in spec.get("upload_defaults", {}).items():
+        value = str(date.today()) if default == "today" else default
+        out[name] = out[name].fillna(value) if name in out.columns else value
+    return out
+
+
+def _send(sf, spec, frames, batches, mode, external_id, progress, on_outcomes=None, on_submitted=None,
+          on_settled=None):
+    """Insert (or upsert on `external_id`) the rows: `frames` for Bulk API 2.0, `batches` for Bulk API"""
+    if mode == "bulk2":
+        return bulk_ingest.insert_frames(sf, spec["object"], frames, on_progress=progress,
+                                         on_submitted=on_submitted, on_settled=on_settled,
+                                         external_id=external_id)
+    if external_id:
+        return bulk_dispatch.upsert_records(sf, spec["object"], external_id, batches, on_progress=progress,
+                                            on_outcomes=on_outcomes)
+    return bulk_dispatch.insert_records(sf, spec["object"], batches, on_progress=progress, on_outcomes=on_outcomes)
+
+
+def _plan_upload(sf, spec, conn, key, file, external_id=None, skip_rows=None):
+    """Journal the duplicate check of every row before anything is sent (an upsert sends every row).
+    `skip_rows` maps more rows to skip (e.g. reviewed fuzzy matches) to the reason"""
+    existing = None
+    if not external_id:
+        existing, _ = check_plan(sf, spec, lambda: file_reader.iter_upload_chunks(file))
+    total = 0
+    for chunk in file_reader.iter_upload_chunks(file):
+        mask = duplicate_mask(sf, spec, chunk, existing) if not external_id else [False] * len(chunk)
+        upload_journal.plan(conn, key, chunk.index, ["skipped" if d else "new" for d in mask])
+        total += len(chunk)
+    if skip_rows:
+        upload_journal.record(conn, key, [(row, "skipped", None, reason) for row, reason in skip_rows.items()])
+    upload_journal.finish_plan(conn, key, total)
+
+
+def _recheck_pending(sf, spec, conn, key, file):
+    """Rows sent by an interrupted run without a recorded result: the ones now in Salesforce went in"""
+    frames = []
+    for chunk in file_reader.iter_upload_chunks(file):
+        pending = upload_journal.rows_with_status(conn, key, ("pending",), chunk.index.min(), chunk.index.max())
+        if pending:
+            frames.append(chunk.loc[pending])
+    if not frames:
+        return
+    frame = pd.concat(frames)
+    # Only the in-flight rows are checked, so the planner normally probes rather than scans
+    existing, _ = check_plan(sf, spec, lambda: [frame])
+    upload_journal.record(conn, key, [
+        (row, "skipped", None, "Already in Salesforce when resumed") if found else (row, "new", None, None)
+        for row, found in zip(frame.index, duplicate_mask(sf, spec, frame, existing))
+    ])
+
+
+# Journal status of a Bulk API 2.0 row by the result file it was found in (None: in none of them)
+_SETTLED_STATUS = {"failedResults": "failed", "unprocessedrecords": "new", None: "pending"}
+
+
+def upload_key(file_hash, spec, external_id=None):
+    """Journal key of an upload; an upsert on an External ID is journaled apart from an insert"""
+    return file_hash, spec["object"] + (f".{external_id}" if external_id else "")
+
+
+def journaled_insert(sf, spec, file, key, file_name=None, on_progress=None, mode="bulk1", external_id=None,
+                     skip_rows=None):
+    """Insert the file's new rows with every row journaled under `key` (file hash, object), so an
+    interrupted upload of the same file resumes without re-checking duplicates or inserting anything twice.
+
+    mode "bulk1" sends concurrent 200-record Bulk API batches, "bulk2" streams
+    the rows into Bulk API 2.0 CSV jobs (see bulk_ingest). With `external_id`
+    every row is upserted on that field instead, and nothing is read first;
+    an upsert needs its own key, see upload_key(). `skip_rows` ({row: reason})
+    are journaled as skipped on the first run.
+
+    Returns the insert totals plus "skipped", "external_id", "resumed" (rows
+    settled by earlier runs), "finished" and "outcome_file" (CSV of the
+    uploaded rows with their outcome).
+    """
+    conn = upload_journal.connect(sf)
+    try:
+        upload_journal.start(conn, key, file_name or file.name)
+        state = upload_journal.status(conn, key)
+        if not state["planned"]:
+            _plan_upload(sf, spec, conn, key, file, external_id, skip_rows)
+        else:
+            upload_journal.unconfirm_submitted(conn, key)
+            state = upload_journal.status(conn, key)
+        if state["counts"]["pending"] and external_id:
+            upload_journal.reset_pending(conn, key)
+        elif state["counts"]["pending"]:
+            _recheck_pending(sf, spec, conn, key, file)
+        before = upload_journal.status(conn, key)["counts"]
+
+        counts = {"skipped": 0}
+        row_of = {}   # id(record) -> file row, until the record's outcome is journaled
+
+        def frames(mark_pending):
+            for chunk in file_reader.iter_upload_chunks(file):
+                rows = upload_journal.rows_with_status(conn, key, ("new",), chunk.index.min(), chunk.index.max())
+                counts["skipped"] += len(chunk) - len(rows)
+                if rows:
+                    if mark_pending:
+                        upload_journal.record(conn, key, [(row, "pending", None, None) for row in rows])
+                    yield prepare_chunk(spec, chunk.loc[rows], keep=[external_id] if external_id else [])
+
+        def batches():
+            # Rows are marked pending batch by batch, just before they are handed to the dispatcher
+            for frame in frames(mark_pending=False):
+                rows = list(frame.index)
+                records = file_reader.frame_to_records(frame)
+                for start in range(0, len(records), bulk_dispatch.BATCH_SIZE):
+                    batch = records[start:start + bulk_dispatch.BATCH_SIZE]
+                    upload_journal.record(conn, key, [(row, "pending", None, None)
+                                                      for row in rows[start:start + len(batch)]])
+                    row_of.update(zip(map(id, batch), rows[start:start + len(batch)]))
+                    yield batch
+
+        def on_outcomes(outcomes):
+            upload_journal.record(conn, key, [
+                (row_of.pop(id(record)), "pending" if whole_call else "failed" if not record_id
+                 else "updated" if external_id and not created else "ok", record_id, error)
+                for record, record_id, error, whole_call, created in outcomes
+            ])
+
+        def on_submitted(job_id, rows):
+            upload_journal.record(conn, key, [(row, "submitted", job_id, None) for row in rows])
+
+        def on_settled(job_id, outcomes):
+            # A row no result mentions (e.g. of a failed job) may or may not have gone in
+            upload_journal.record(conn, key, [
+                (row, _SETTLED_STATUS[kind] if kind != "successfulResults"
+                 else "updated" if external_id and not created else "ok", record_id, error)
+                for row, kind, record_id, error, created in outcomes
+            ])
+
+        progress = (lambda totals: on_progress(dict(totals, skipped=counts["skipped"]))) if on_progress else None
+        totals = _send(sf, spec, frames(mark_pending=True) if mode == "bulk2" else None,
+                       batches() if mode != "bulk2" else None, mode, external_id, progress,
+                       on_outcomes=on_outcomes, on_submitted=on_submitted, on_settled=on_settled)
+        totals["skipped"] = upload_journal.status(conn, key)["counts"]["skipped"]
+        totals["external_id"] = external_id
+        totals["resumed"] = sum(before[s] for s in ("ok", "updated", "failed"))
+        totals["finished"] = upload_journal.finish(conn, key)
+        totals["outcome_file"] = upload_journal.write_outcomes(sf, conn, key, file_reader.iter_upload_chunks(file))
+    finally:
+        conn.close()
+    search_cache.clear(search_cache.scope_for(sf), spec["object"])
+    clear_dashboard(sf, spec)
+    local_replica.invalidate(sf, spec["object"])
+    return totals
+
+
+# ------------------- FORM BUILDER -------------------
+def _widget(spec, field, prefix, record, lookup_options):
+    name = field["name"]
+    label = field["label"] + (" *" if field.get("required") else "")
+    key = f"{spec['object']}_{name}_{prefix}"
+    value = record.get(name)
+    kind = field["type"]
+
+    if kind == "textarea":
+        return st.text_area(label, value=value or "", max_chars=field.get("max_chars"), key=key)
+    if kind == "picklist":
+        options = ([] if field.get("required") else [""]) + list(field["options"])
+        if value and value not in options:
+            options.append(value)
+        return st.selectbox(label, options, index=options.index(value) if value in options else 0, key=key)
+    if kind == "number":
+        return st.number_input(label, value=float(value or 0), step=field.get("step", 1.0), key=key)
+    if kind == "int":
+        return int(st.number_input(label, value=int(value or 0), step=1, key=key))
+    if kind == "checkbox":
+        return st.checkbox(label, value=bool(value), key=key)
+    if kind == "date":
+        picked = st.date_input(label, value=pd.to_datetime(value).date() if value else date.today(), key=key)
+        return str(picked)
+    if kind == "lookup":
+        options = [("", "")] + lookup_options.get(name, [])
+        ids = [account_id for account_id, _ in options]
+        chosen = st.selectbox(label, range(len(options)), index=ids.index(value) if value in ids else 0,
+                              format_func=lambda i: f"{options[i][1]} ({options[i][0]})" if options[i][0] else "",
+                              key=key)
+        return options[chosen][0]
+    return st.text_input(label, value="" if value is None else str(value), max_chars=field.get("max_chars"), key=key)
+
+
+def lookup_options(sf, spec, prefix, record):
+    """Type-ahead box per Account lookup; must sit outside the form so typing reruns the page"""
+    options = {}
+    for f in _lookups(spec):
+        text = st.text_input(f"🔎 Find {f['label']} (type the start of its name)",
+                             key=f"{spec['object']}_{f['name']}_search_{prefix}")
+        current_id = record.get(f["name"])
+        current_name = lookup_name(record, f)
+        try:
+            options[f["name"]] = account_lookup.options(sf, text, current_id, current_name)
+        except Exception as e:
+            st.error(f"❌ Account lookup failed: {e}")
+            options[f["name"]] = [(current_id, current_name)] if current_id else []
+    return options
+
+
+def build_form(spec, prefix, record, lookups):
+    """Render the spec's fields in columns; returns {API name: value}"""
+    editable = [f for f in spec["fields"] if not (record.get("Id") and f.get("read_only"))]
+    columns = sorted({f["col"] for f in editable if f["col"] != "wide"})
+    values = {}
+
+    col_outer, _ = st.columns([2, 1])
+    with col_outer:
+        for col, index in zip(st.columns(len(columns) or 1), columns):
+            with col:
+                for f in editable:
+                    if f["col"] == index:
+                        values[f["name"]] = _widget(spec, f, prefix, record, lookups)
+        for f in editable:
+            if f["col"] == "wide":
+                values[f["name"]] = _widget(spec, f, prefix, record, lookups)
+    return values
+
+
+# ------------------- PAGE -------------------
+def searching_indicator():
+    """Placeholder plus an on_wait callback for search_cache: it shows that a search is running,
+    and each update lets Streamlit stop this run if a newer term was entered meanwhile"""
+    placeholder = st.empty()
+    return placeholder, lambda: placeholder.caption("⏳ Searching...")
+
+
+def open_record_key(object_name):
+    """Session key another page sets to open a record in this object's edit form"""
+    return f"{object_name}_open_id"
+
+
+def _save_and_rerun(sf, spec, values, record_id, done_message, fail_message, original=None):
+    missing = missing_required(spec, values, updating=bool(record_id))
+    if missing:
+        st.warning(f"⚠️ Please enter {', '.join(missing)} before saving.")
+        return
+    unchanged = record_id and original is not None and not changed_values(spec, values, original)
+    ok, err = save_record(sf, spec, values, record_id, original)
+    if ok and unchanged:
+        st.info("ℹ️ Nothing changed, so no update was sent.")
+    elif ok:
+        st.success(done_message)
+        time.sleep(1)
+        st.rerun()
+    else:
+        st.error(f"{fail_message}: {err}")
+
+
+def _search_tab(sf, spec):
+    obj = spec["object"]
+    fields = _field_map(spec)
+    search_labels = " or ".join(fields[n]["label"] if n in fields else n for n in spec["search_fields"])
+    st.markdown(f"<h4 style='color: {spec['color']};'>🔍 Search {spec['plural']}</h4>", unsafe_allow_html=True)
+    term = st.text_input(f"Enter {search_labels} to search", key=f"{obj}_search_input")
+    # A record opened from the global search is shown until a search term is typed
+    opened = st.session_state.get(open_record_key(obj))
+    if term:
+        st.session_state.pop(open_record_key(obj), None)
+    elif not opened:
+        return
+
+    page_key = f"{obj.lower()}_search_page"
+    status, on_wait = searching_indicator()
+    try:
+        if term:
+            page = search(sf, spec, term, pagination.current_cursor(page_key, term), on_wait=on_wait)
+        else:
+            page = fetch_record(sf, spec, opened)
+    except Exception as e:
+        st.error(f"❌ Salesforce Query Error: {e}")
+        return
+    finally:
+        status.empty()
+    results = page["records"]
+    if not results:
+        st.warning("⚠️ No records found.")
+        return
+
+    if term:
+        st.success(f"✅ Found {pagination.page_total(page_key, page)} record(s)")
+    else:
+        st.info(f"📌 Opened from the global search: {option_label(spec, results[0])}")
+    st.dataframe(list_frame(spec, results), use_container_width=True)
+    if term:
+        pagination.page_controls(page_key, page)
+
+    options = [option_label(spec, r) for r in results]
+    selected_idx = st.selectbox("Select record to edit", range(len(results)), format_func=lambda x: options[x],
+                                key=f"{obj}_selected")
+    record = results[selected_idx]
+    record_id = record["Id"]
+
+    st.markdown(f"<h4 style='color: {spec['color']};'>✏️ Edit {obj}</h4>", unsafe_allow_html=True)
+    lookups = lookup_options(sf, spec, f"edit_{record_id}", record)
+    with st.form(f"{obj}_edit_form_{record_id}"):
+        values = build_form(spec, f"edit_{record_id}", record, lookups)
+
+        col_btn1, col_btn2, _ = st.columns([1, 1, 3])
+        with col_btn1:
+            update_click = st.form_submit_button("💾 Update", use_container_width=True)
+        with col_btn2:
+            delete_click = st.form_submit_button("🗑️ Delete", use_container_width=True)
+        confirm_delete = st.checkbox("Confirm delete", key=f"{obj}_confirm_delete_{record_id}")
+
+        if update_click:
+            _save_and_rerun(sf, spec, values, record_id, "✅ Record updated successfully!", "❌ Update failed",
+                            original=record)
+
+        if delete_click:
+            if confirm_delete:
+                ok, err = delete_record(sf, spec, record_id)
+                if ok:
+                    st.warning("⚠️ Record deleted successfully!")
+                    time.sleep(1)
+                    st.rerun()
+                else:
+                    st.error(f"❌ Delete failed: {err}")
+            else:
+                st.warning("⚠️ Please confirm delete before proceeding.")
+
+
+def _create_tab(sf, spec):
+    obj = spec["object"]
+    st.markdown(f"<h4 style='color: {spec['color']};'>➕ Add New {obj}</h4>", unsafe_allow_html=True)
+    lookups = lookup_options(sf, spec, "new", {})
+    with st.form(f"{obj}_new_form", clear_on_submit=True):
+        values = build_form(spec, "new", {}, lookups)
+        if st.form_submit_button(f"💾 Save New {obj}", use_container_width=True):
+            _save_and_rerun(sf, spec, values, None, "✅ Record added successfully!", "❌ Failed to add record")
+
+
+def _read_outcomes(path):
+    """Contents of an outcome file; empty if it was removed after its button was shown"""
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return b""
+
+
+def _outcome_download(path, key):
+    if not path or not os.path.exists(path):
+        st.caption("The per-row outcome file is no longer available.")
+        return
+    st.download_button("📥 Download per-row outcomes", data=lambda: _read_outcomes(path),
+                       file_name=f"{key[1]}_upload_outcomes.csv", mime="text/csv",
+                       key=f"outcomes_{key[1]}_{key[0][:16]}")
+
+
+def _show_totals(totals):
+    for err in totals["errors"][:5]:
+        st.error(f"Error inserting batch: {err}")
+    if totals.get("resumed"):
+        st.info(f"↩️ Resumed: {totals['resumed']} rows were already settled by an earlier run.")
+    if totals.get("external_id"):
+        st.success(f"✅ Upsert on {totals['external_id']} complete! {totals['created']} created, "
+                   f"{totals['success'] - totals['created']} updated, {totals['failed']} failed.")
+    elif totals["success"] + totals["failed"] == 0:
+        st.warning("⚠️ All records already exist — nothing new to insert.")
+    else:
+        st.success(f"✅ Upload complete! {totals['success']} inserted, {totals['failed']} failed, "
+                   f"{totals['skipped']} duplicates skipped.")
+    if totals.get("finished") is False:
+        st.warning("⚠️ Some rows were not confirmed. Upload the same file again to resume.")
+    if totals["failures"]:
+        st.dataframe(pd.DataFrame([dict(record, Error=message) for record, message in totals["failures"]]),
+                     use_container_width=True)
+    if totals.get("result_files"):
+        st.caption(f"📁 Bulk API 2.0 jobs {', '.join(totals['jobs'])}; full result files: "
+                   + ", ".join(totals["result_files"]))
+
+
+def _fuzzy_review(sf, spec, file, review_key):
+    """Optional near-duplicate review of an upload; returns {row: reason} for the rows to skip too.
+    The review and the choice to skip are kept per uploaded file: the rows are row numbers of that file."""
+    obj = spec["object"]
+    fields = " + ".join(spec["fuzzy_fields"])
+    if not st.checkbox(f"🔍 Also look for near-duplicate {fields} (e.g. \"ACME, Inc.\" vs \"Acme Inc\")",
+                       key=f"{obj}_fuzzy_check"):
+        return {}
+    if review_key not in st.session_state:
+        with st.spinner("Looking for near-duplicates..."):
+            st.session_state[review_key] = fuzzy_match.likely_duplicates(sf, spec, file_reader.iter_upload_chunks(file))
+    found = st.session_state[review_key]
+    if found.empty:
+        st.success(f"✅ No near-duplicates found (similarity {fuzzy_match.REVIEW_SCORE:.0%} or more).")
+        return {}
+
+    st.warning(f"🤔 {len(found)} new rows look like existing {spec['plural']}. Review them below.")
+    review = found.reset_index(names="row").assign(row=lambda df: df["row"] + 1).rename(columns={
+        "row": "Row", "name": "Uploaded", "match_name": f"Existing {obj}", "match_id": "Existing Id",
+        "score": "Similarity"})
+    st.dataframe(review, use_container_width=True, hide_index=True)
+    st.download_button("📥 Download the near-duplicates", review.to_csv(index=False), mime="text/csv",
+                       file_name=f"{obj}_near_duplicates.csv", key=f"{obj}_fuzzy_download")
+    if not st.checkbox(f"Skip these {len(found)} rows too", key=f"{obj}_fuzzy_skip_{file.file_id}"):
+        return {}
+    return {row: f"Likely duplicate of {match_id} ({score:.0%} similar)"
+            for row, match_id, score in zip(found.index, found["match_id"], found["score"])}
+
+
+def _upload_jobs_panel(owner, spec):
+    """Progress and outcome of this user's background uploads; polls while any is running"""
+    jobs = upload_jobs.jobs_for(owner, spec["object"])
+    if not jobs:
+        return
+
+    def panel():
+        current = upload_jobs.jobs_for(owner, spec["object"])
+        for job in current:
+            done = job["progress"]
+            with st.container(border=True):
+                st.markdown(f"**📦 {job['file']}** — {job['state']} (job {job['id']})")
+                if job["state"] in ("queued", "running"):
+                    finished = done.get("success", 0) + done.get("failed", 0) + done.get("skipped", 0)
+                    st.progress(min(finished / job["total"], 1.0) if job["total"] else 0.0,
+                                text=f"{done.get('success', 0)} inserted, {done.get('failed', 0)} failed")
+                    continue
+                if job["error"]:
+                    st.error(f"❌ Bulk upload failed: {job['error']}")
+                    st.caption("Upload the same file again to resume where it stopped.")
+                else:
+                    _show_totals(job["result"])
+                    if job["result"].get("outcome_file"):
+                        _outcome_download(job["result"]["outcome_file"], job["ref"])
+                if st.button("Dismiss", key=f"dismiss_{job['id']}"):
+                    upload_jobs.dismiss(owner, job["id"])
+                    st.rerun()
+        # A full rerun once the last job has finished stops the polling
+        if running and all(j["finished"] for j in current):
+            st.rerun()
+
+    running = not all(j["finished"] for j in jobs)
+    st.fragment(panel, run_every=1 if running else None)()
+
+
+def _bulk_tab(sf, spec):
+    obj = spec["object"]
+    st.markdown(f"<h4 style='color: {spec['color']};'>📤 Bulk Upload {spec['plural']} (Avoid Duplicates)</h4>",
+                unsafe_allow_html=True)
+    if spec["key_fields"]:
+        st.info(f"Upload Excel/CSV. Existing {spec['plural']} ({' + '.join(spec['key_fields'])}) "
+                "will be skipped automatically.")
+
+    # Uploads run in the background; this re-attaches to them after reruns and reconnects
+    owner = (sf.sf_instance, st.session_state.get("userid", ""))
+    _upload_jobs_panel(owner, spec)
+
+    # A new key empties the uploader after a job has been submitted
+    nonce_key = f"{obj.lower()}_upload_nonce"
+    file = st.file_uploader("Upload Excel or CSV", type=["xlsx", "csv"],
+                            key=f"{obj}_upload_{st.session_state.get(nonce_key, 0)}")
+    if not file:
+        return
+
+    try:
+        preview = file_reader.read_upload_preview(file)
+        st.write("✅ File Uploaded Successfully. Preview below:")
+        st.dataframe(preview, use_container_width=True)
+
+        missing = [c for c in spec["upload_required"] if c not in preview.columns]
+        if missing:
+            st.warning(f"⚠️ Missing required columns: {', '.join(missing)}")
+            return
+
+        # With an External ID column Salesforce decides insert vs update itself, so nothing is read first
+        external_id = None
+        if spec.get("external_ids"):
+            external_id = st.radio("Match existing records", [None] + spec["external_ids"], horizontal=True,
+                                   format_func=lambda f: f"Upsert on External ID {f}" if f
+                                   else "Skip duplicates, insert new rows", key=f"{obj}_match_on")
+            if external_id and external_id not in preview.columns:
+                st.warning(f"⚠️ The file needs a {external_id} column to upsert on it.")
+                return
+
+        # The hash and duplicate summary only depend on the file, so later reruns reuse them. They are
+        # keyed on the uploader's file id: an edited file of the same name and size is a new upload.
+        hash_key = f"{obj.lower()}_upload_hash_{file.file_id}"
+        if hash_key not in st.session_state:
+            st.session_state[hash_key] = upload_journal.file_hash(file)
+        key = upload_key(st.session_state[hash_key], spec, external_id)
+        if any(j["ref"] == key and not j["finished"] for j in upload_jobs.jobs_for(owner, obj)):
+            st.info("⏳ This file is being uploaded right now — see its progress above.")
+            return
+
+        conn = upload_journal.connect(sf)
+        try:
+            journal = upload_journal.status(conn, key)
+            if journal and journal["finished"]:
+                done = journal["counts"]
+                st.success(f"✅ This file was already uploaded ({journal['started']}): {done['ok']} inserted, "
+                           + (f"{done['updated']} updated, " if external_id else "")
+                           + f"{done['failed']} failed, "
+                           f"{done['skipped']} duplicates skipped.")
+                _outcome_download(upload_journal.outcome_path(sf, key), key)
+                if st.button("🔁 Upload this file again from scratch", key=f"{obj}_upload_again"):
+                    upload_journal.forget(conn, key)
+                    st.rerun()
+                return
+        finally:
+            conn.close()
+
+        summary_key = f"{obj.lower()}_upload_summary_{file.file_id}_{external_id}"
+        skip_rows = {}
+        if journal and journal["planned"]:
+            # Resuming: the journal already knows every row, nothing is re-checked
+            done = journal["counts"]
+            total_count = journal["total"]
+            duplicate_count = done["skipped"]
+            new_count = done["new"] + done["pending"] + done["submitted"]
+            saved = done["ok"] + done["updated"]
+            st.info(f"↩️ This file was partly uploaded before: {saved} saved, "
+                    f"{done['failed']} failed. The remaining {new_count} rows will be sent; "
+                    "nothing is inserted twice.")
+        elif external_id:
+            if summary_key not in st.session_state:
+                st.session_state[summary_key] = sum(len(c) for c in file_reader.iter_upload_chunks(file))
+            total_count = new_count = st.session_state[summary_key]
+            st.info(f"🔁 {total_count} rows will be upserted on {external_id}: Salesforce updates the records "
+                    "it finds and creates the rest, so no duplicate check is needed.")
+        else:
+            if summary_key not in st.session_state:
+                with st.spinner("Checking for duplicates..."):
+                    st.session_state[summary_key] = count_duplicates(sf, spec, file)
+            total_count, duplicate_count, plan = st.session_state[summary_key]
+            new_count = total_count - duplicate_count
+
+            st.success(f"✅ {total_count} records ready.")
+            st.info(f"🧾 {duplicate_count} duplicates skipped, {new_count} new to insert.")
+            st.caption(describe_plan(plan))
+            if spec.get("fuzzy_fields"):
+                skip_rows = _fuzzy_review(sf, spec, file, f"{obj.lower()}_upload_fuzzy_{file.file_id}")
+                new_count -= len(skip_rows)
+        if new_count == 0:
+            st.warning("⚠️ No new records to insert — all were duplicates.")
+            return
+
+        mode = st.radio("Insert with", list(bulk_ingest.MODES), format_func=bulk_ingest.MODES.get,
+                        horizontal=True, key=f"{obj}_insert_mode")
+        mode = bulk_ingest.choose_mode(mode, new_count)
+
+        label = f"🚀 Upsert {spec['plural']}" if external_id else f"🚀 Insert New {spec['plural']}"
+        if st.button(label, key=f"{obj}_insert_button"):
+            upload_jobs.submit(owner, obj, file, total_count,
+                               lambda f, on_progress: journaled_insert(sf, spec, f, key, file_name=file.name,
+                                                                       on_progress=on_progress, mode=mode,
+                                                                       external_id=external_id,
+                                                                       skip_rows=skip_rows),
+                               ref=key)
+            st.session_state.pop(hash_key, None)
+            st.session_state.pop(summary_key, None)
+            st.session_state.pop(f"{obj.lower()}_upload_fuzzy_{file.file_id}", None)
+            st.session_state[nonce_key] = st.session_state.get(nonce_key, 0) + 1
+            st.rerun()
+    except Exception as e:
+        st.error(f"❌ Bulk upload failed: {e}")
+
+
+def run(spec, extra_tabs=()):
+    """Render the search/edit, create and bulk upload tabs for one object, then any `extra_tabs`
+    ((label, render(sf, spec)) pairs)"""
+    st.markdown(
+        f"<h3 style='color: {spec['color']};'>{spec['icon']} Salesforce {spec['object']} Management</h3>",
+        unsafe_allow_html=True
+    )
+    st.write(f"You can search, add, edit, delete, or bulk upload {spec['object']} records.")
+
+    sf = st.session_state.sf_connection
+    local_replica.start(sf, lambda: replica_tables(sf))
+    try:
+        spec = object_specs.live(sf, spec)
+    except Exception as e:
+        st.caption(f"⚠️ Using the built-in field list, the org's field metadata is unavailable: {e}")
+    tab1, tab2, tab3, *extra = st.tabs([f"🔍 Search & Edit {spec['plural']}", f"➕ Create New {spec['object']}",
+                                        f"📤 Bulk Upload {spec['plural']}"] + [label for label, _ in extra_tabs])
+    with tab1:
+        _search_tab(sf, spec)
+    with tab2:
+        _create_tab(sf, spec)
+    with tab3:
+        _bulk_tab(sf, spec)
+    for tab, (_, render) in zip(extra, extra_tabs):
+        with tab:
+            render(sf, spec)
+
+
+def run_described(object_name):
+    """Page for an object configured only by name; its spec comes from describe()"""
+    try:
+        spec = object_specs.described(st.session_state.sf_connection, object_name)
+    except Exception as e:
+        st.error(f"❌ Could not describe {object_name}: {e}")
+        return
+    run(spec)
@@ -0,0 +1,59 @@
+import importlib
+import os
+import threading
+import time
+
+# ------------------- OBJECT MODULE REGISTRY -------------------
+# The object pages, and pandas which they all use, are imported the first
+# time a user opens them rather than when app.py starts, so the login
+# screen and first paint do not pay for the whole import graph.
+
+# Pages that are not a single object, listed before the objects
+PAGES = {
+    "🔎 Search All Objects": "global_search",
+}
+OBJECT_MODULES = {
+    "Account": "account",
+    "Contact": "contact",
+    "Opportunity": "opportunity",
+    "Lead": "lead",
+}
+# Further objects (e.g. "Case,Invoice__c") get a page built from their describe()
+EXTRA_OBJECTS = [o.strip() for o in os.getenv("SFDC_EXTRA_OBJECTS", "").split(",") if o.strip()]
+
+_lock = threading.Lock()
+_load_times = {}   # module name -> seconds its first import took
+
+
+def labels():
+    """Page and object names in the order they are offered in the picker"""
+    return list(PAGES) + list(OBJECT_MODULES) + [o for o in EXTRA_OBJECTS if o not in OBJECT_MODULES]
+
+
+def _import(name):
+    with _lock:
+        if name not in _load_times:
+            start = time.perf_counter()
+            importlib.import_module(name)
+            _load_times[name] = time.perf_counter() - start
+    return importlib.import_module(name)
+
+
+def load(label):
+    """Import the module behind a page or object label (only the first call pays for the import)"""
+    return _import(PAGES.get(label) or OBJECT_MODULES[label])
+
+
+def load_times():
+    """First-import time of every object module loaded so far"""
+    with _lock:
+        return dict(_load_times)
+
+
+def run(label):
+    """Render the page for an object label"""
+    if label in PAGES or label in OBJECT_MODULES:
+        load(label).run()
+    else:
+        _import("object_engine").run_described(label)
+
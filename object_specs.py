@@ -0,0 +1,265 @@
+import describe_cache
+
+# ------------------- OBJECT SPECS -------------------
+# Field specs that drive object_engine. Each object lists its fields in
+# form order; "col" places a field in a form column ("wide" = full width
+# below the columns). Field types: text, textarea, picklist, number, int,
+# date, checkbox and lookup (a parent Account picked through
+# account_lookup). Objects without a hand-written spec get one built from
+# their describe() metadata, and the hand-written ones take picklist
+# values, lengths and required/updateable flags from it (see live()).
+#
+# Duplicate checks on upload ("dedup"): "index" uses the local Account
+# name index, "hash" compares hashed key_fields against existing records.
+# Small uploads instead ask Salesforce about their own probe_field values
+# (see dedup_planner). Objects with External ID fields ("external_ids",
+# from describe) can also be upserted on one, which needs no check at all.
+# "fuzzy_fields" opt an object into the near-duplicate review of uploads
+# (see fuzzy_match). "dashboard_cache" names the search_cache entries of an
+# object's dashboard (see pipeline_dashboard); every write through
+# object_engine clears them.
+
+INDUSTRY_OPTIONS = [
+    "Apparel", "Banking", "Biotechnology", "Chemicals", "Communications", "Construction",
+    "Consulting", "Education", "Electronics", "Energy", "Engineering", "Entertainment",
+    "Environmental", "Finance", "Food & Beverage", "Government", "Healthcare", "Hospitality",
+    "Insurance", "Machinery", "Manufacturing", "Media", "Not For Profit", "Recreation",
+    "Retail", "Shipping", "Technology", "Telecommunications", "Transportation", "Utilities", "Other"
+]
+LEAD_SOURCE_OPTIONS = ["Web", "Phone Inquiry", "Partner Referral", "Purchased List", "Other"]
+RATING_OPTIONS = ["Hot", "Warm", "Cold"]
+
+
+def _field(name, label, type="text", col=0, **extra):
+    return dict(extra, name=name, label=label, type=type, col=col)
+
+
+ACCOUNT = {
+    "object": "Account",
+    "plural": "Accounts",
+    "icon": "🏦",
+    "color": "orange",
+    "search_fields": ["Name"],
+    "list_fields": ["Name", "Phone", "Industry", "BillingCountry", "Rating", "Type"],
+    "option_label": "{Name} | {Phone} | {Industry}",
+    "dedup": "index",
+    "key_fields": ["Name"],
+    "fuzzy_fields": ["Name"],
+    "upload_required": ["Name"],
+    "fields": [
+        _field("Name", "Name", required=True),
+        _field("Phone", "Phone"),
+        _field("ParentId", "Parent Account", "lookup", relationship="Parent"),
+        _field("Type", "Account Type", "picklist", options=[
+            "Business Partners", "Technology Partners", "Direct Customers", "Support Team", "Prospect",
+            "Customer - Direct", "Customer - Channel", "Channel Partner / Reseller",
+            "Installation Partner", "Technology Partner"
+        ]),
+        _field("Rating", "Rating", "picklist", col=1, options=RATING_OPTIONS),
+        _field("Industry", "Industry", "picklist", col=1, options=INDUSTRY_OPTIONS),
+        _field("BillingCountry", "Country", col=1),
+        _field("Active__c", "Active", "picklist", col=1, options=["Yes", "No"]),
+        _field("BillingStreet", "Billing Street", col=2),
+        _field("BillingCity", "Billing City", col=2),
+        _field("BillingState", "Billing State", col=2),
+        _field("BillingPostalCode", "Billing Postal Code", col=2),
+        _field("ShippingStreet", "Shipping Street", col=3),
+        _field("ShippingCity", "Shipping City", col=3),
+        _field("ShippingState", "Shipping State", col=3),
+        _field("ShippingPostalCode", "Shipping Postal Code", col=3),
+    ],
+}
+
+CONTACT = {
+    "object": "Contact",
+    "plural": "Contacts",
+    "icon": "👤",
+    "color": "orange",
+    "search_fields": ["FirstName", "LastName", "Email"],
+    "list_fields": ["FirstName", "LastName", "Email", "Phone", "Title", "AccountId"],
+    "option_label": "{FirstName} {LastName} | {Email} | {Phone}",
+    "dedup": "hash",
+    "key_fields": ["FirstName", "LastName", "Email"],
+    "probe_field": "Email",
+    "upload_required": ["FirstName", "LastName", "Email"],
+    "fields": [
+        _field("FirstName", "First Name"),
+        _field("LastName", "Last Name", required=True),
+        _field("Title", "Title"),
+        _field("Phone", "Phone", col=1),
+        _field("Email", "Email", col=1),
+        _field("Department", "Department", col=1),
+        _field("MailingCountry", "Country", col=2),
+        _field("LeadSource", "Lead Source", "picklist", col=2, options=LEAD_SOURCE_OPTIONS),
+        _field("AccountId", "Account (Parent)", "lookup", col=2, relationship="Account"),
+    ],
+}
+
+OPPORTUNITY = {
+    "object": "Opportunity",
+    "plural": "Opportunities",
+    "icon": "💼",
+    "color": "#FF8800",
+    "search_fields": ["Name"],
+    "list_fields": ["Name", "AccountId", "StageName", "CloseDate", "Amount", "Probability"],
+    "option_label": "{Name} | {StageName} | {Amount}",
+    "dedup": "hash",
+    "key_fields": ["Name"],
+    "upload_required": ["Name"],
+    "upload_defaults": {"StageName": "Prospecting", "CloseDate": "today"},
+    "dashboard_cache": "Opportunity pipeline",
+    "fields": [
+        _field("Name", "Opportunity Name", required=True),
+        _field("AccountId", "Account (Parent)", "lookup", required=True, relationship="Account"),
+        _field("StageName", "Stage", "picklist", required=True, options=[
+            "Prospecting", "Qualification", "Needs Analysis", "Value Proposition",
+            "Id. Decision Makers", "Perception Analysis", "Proposal/Price Quote",
+            "Negotiation/Review", "Closed Won", "Closed Lost"
+        ]),
+        _field("CloseDate", "Close Date", "date", required=True),
+        _field("NextStep", "Next Step"),
+        _field("Amount", "Amount", "number", col=1, step=100.0),
+        _field("Probability", "Probability (%)", "number", col=1, step=1.0),
+        _field("Type", "Type", "picklist", col=1, options=[
+            "New Customer", "Existing Customer - Upgrade", "Existing Customer - Replacement",
+            "Existing Customer - Downgrade"
+        ]),
+        _field("LeadSource", "Lead Source", "picklist", col=1, options=LEAD_SOURCE_OPTIONS),
+        _field("ForecastCategoryName", "Forecast Category", "picklist", col=1,
+               options=["Pipeline", "Best Case", "Commit", "Closed", "Omitted"]),
+        _field("Description", "Description", "textarea", col="wide"),
+    ],
+}
+
+LEAD = {
+    "object": "Lead",
+    "plural": "Leads",
+    "icon": "👤",
+    "color": "#FFA500",
+    "search_fields": ["LastName", "Company", "Email"],
+    "list_fields": ["FirstName", "LastName", "Company", "Email", "Phone", "Status"],
+    "option_label": "{FirstName} {LastName} | {Company}",
+    "dedup": "hash",
+    "key_fields": ["LastName", "Company", "Email"],
+    "fuzzy_fields": ["LastName", "Company"],
+    "probe_field": "Email",
+    "upload_required": ["LastName", "Company"],
+    "fields": [
+        _field("FirstName", "First Name"),
+        _field("LastName", "Last Name", required=True),
+        _field("Company", "Company", required=True),
+        _field("Title", "Title"),
+        _field("Phone", "Phone"),
+        _field("MobilePhone", "Mobile", col=1),
+        _field("Email", "Email", col=1),
+        _field("Rating", "Rating", "picklist", col=1, options=RATING_OPTIONS),
+        _field("LeadSource", "Lead Source", "picklist", col=1, options=LEAD_SOURCE_OPTIONS),
+        _field("Status", "Status", "picklist", col=1, options=[
+            "Open - Not Contacted", "Working - Contacted", "Closed - Converted", "Closed - Not Converted"
+        ]),
+        _field("Industry", "Industry", "picklist", col=2, options=INDUSTRY_OPTIONS),
+        _field("AnnualRevenue", "Annual Revenue", "number", col=2, step=1000.0),
+        _field("NumberOfEmployees", "Number of Employees", "int", col=2),
+        _field("City", "City", col=2),
+        _field("State", "State", col=2),
+        _field("PostalCode", "Postal Code", col=2),
+        _field("Country", "Country", col=2),
+        _field("Street", "Street", "textarea", col="wide"),
+        _field("Description", "Description", "textarea", col="wide"),
+    ],
+}
+
+SPECS = {spec["object"]: spec for spec in (ACCOUNT, CONTACT, OPPORTUNITY, LEAD)}
+
+
+# ------------------- DESCRIBE-BASED SPECS -------------------
+_TYPE_MAP = {
+    "textarea": "textarea", "picklist": "picklist", "double": "number", "currency": "number",
+    "percent": "number", "int": "int", "date": "date", "boolean": "checkbox",
+}
+# Compound and system fields that cannot be written directly
+_SKIP_TYPES = {"address", "location", "id", "base64", "anyType", "complexvalue"}
+FORM_COLUMNS = 3
+
+
+def _active_values(field):
+    return [p["value"] for p in field.get("picklistValues", []) if p.get("active")]
+
+
+def _is_required(field):
+    return field["createable"] and not field["nillable"] and not field.get("defaultedOnCreate") \
+        and field["type"] != "boolean"
+
+
+def _max_chars(field):
+    return {"max_chars": field["length"]} if field["type"] in ("string", "textarea") and field.get("length") else {}
+
+
+def _external_ids(described_fields):
+    """External ID fields an upsert can match on (they must be both createable and updateable)"""
+    return [f["name"] for f in described_fields if f.get("externalId") and f["createable"] and f["updateable"]]
+
+
+def spec_from_describe(describe):
+    """Build an engine spec from an sObject describe() result"""
+    fields = []
+    name_field = None
+    for f in describe["fields"]:
+        if f.get("nameField"):
+            name_field = f["name"]
+        if f["type"] in _SKIP_TYPES or f.get("deprecatedAndHidden") or not (f["createable"] or f["updateable"]):
+            continue
+        if f["type"] == "reference" and f.get("referenceTo") == ["Account"] and f.get("relationshipName"):
+            extra = {"type": "lookup", "relationship": f["relationshipName"]}
+        elif f["type"] == "picklist":
+            extra = {"type": "picklist", "options": _active_values(f)}
+        else:
+            extra = dict(_max_chars(f), type=_TYPE_MAP.get(f["type"], "text"))
+        fields.append(dict(extra, name=f["name"], label=f["label"], col=len(fields) % FORM_COLUMNS,
+                           required=_is_required(f), read_only=not f["updateable"]))
+    for f in fields:
+        if f["type"] == "textarea":
+            f["col"] = "wide"
+
+    name_field = name_field or "Id"
+    writable_name = any(f["name"] == name_field for f in fields)
+    shown = [name_field] + [f["name"] for f in fields if f["name"] != name_field][:5]
+    return {
+        "object": describe["name"],
+        "plural": describe.get("labelPlural") or describe["name"],
+        "icon": "🗂️",
+        "color": "orange",
+        "search_fields": [name_field],
+        "list_fields": shown,
+        "option_label": " | ".join("{%s}" % name for name in shown[:3]),
+        "dedup": "hash",
+        "key_fields": [name_field] if writable_name else [],
+        "upload_required": [f["name"] for f in fields if f["required"]],
+        "external_ids": _external_ids(describe["fields"]),
+        "fields": fields,
+    }
+
+
+def described(sf, object_name):
+    """Spec for an object without a hand-written one, built from its cached describe()"""
+    return spec_from_describe(describe_cache.describe(sf, object_name))
+
+
+def live(sf, spec):
+    """A hand-written spec checked against the org's describe(): picklists, lengths and
+    required/updateable flags come from the org, and fields it lacks or that cannot be
+    written are dropped so saves do not fail on them"""
+    described_fields = describe_cache.fields_by_name(sf, spec["object"])
+    fields = []
+    for field in spec["fields"]:
+        f = described_fields.get(field["name"])
+        if f is None or not (f["createable"] or f["updateable"]):
+            continue
+        field = dict(field, required=field.get("required", False) or _is_required(f),
+                     read_only=field.get("read_only", False) or not f["updateable"])
+        if field["type"] == "picklist" and _active_values(f):
+            field["options"] = _active_values(f)
+        elif field["type"] in ("text", "textarea"):
+            field.update(_max_chars(f))
+        fields.append(field)
+    return dict(spec, fields=fields, external_ids=_external_ids(described_fields.values()))
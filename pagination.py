@@ -0,0 +1,62 @@
+import streamlit as st
+
+# ------------------- KEYSET PAGINATION -------------------
+# Searches fetch one page at a time, ordered by Id, and the next page
+# starts after the last Id of the current one ("keyset" paging). Every
+# page costs the same whatever its position, unlike OFFSET, which
+# Salesforce caps at 2,000. The total comes from a COUNT() query that runs
+# only for the first page.
+
+PAGE_SIZE = 50
+
+
+def soql_escape(value):
+    """Escape a user-entered value for use inside a quoted SOQL string literal"""
+    return str(value).replace("\\", "\\\\").replace("'", "\\'")
+
+
+def fetch_page(sf, fields, object_name, where, page_size=PAGE_SIZE, after_id=None):
+    """Fetch one page of records matching `where`; returns records, has_more and (first page only) total"""
+    clause = f"({where}) AND Id > '{after_id}'" if after_id else where
+    query = f"SELECT {fields} FROM {object_name} WHERE {clause} ORDER BY Id LIMIT {page_size + 1}"
+    records = sf.query(query)['records']
+    page = {"records": records[:page_size], "has_more": len(records) > page_size}
+    if after_id is None:
+        page["total"] = sf.query(f"SELECT COUNT() FROM {object_name} WHERE {where}")['totalSize']
+    return page
+
+
+def current_cursor(key, term):
+    """Id after which the current page starts (None for the first page); resets when the term changes"""
+    state = st.session_state.get(key)
+    if state is None or state["term"] != term:
+        state = {"term": term, "cursors": [None], "total": 0}
+        st.session_state[key] = state
+    return state["cursors"][-1]
+
+
+def page_total(key, page):
+    """Total number of matches for the current term (counted with the first page)"""
+    state = st.session_state[key]
+    if "total" in page:
+        state["total"] = page["total"]
+    return state["total"]
+
+
+def page_controls(key, page, page_size=PAGE_SIZE):
+    """Previous/next buttons and a page indicator below a result list"""
+    state = st.session_state[key]
+    page_no = len(state["cursors"])
+    page_count = max((state["total"] + page_size - 1) // page_size, 1)
+
+    col_prev, col_info, col_next, _ = st.columns([1, 2, 1, 4])
+    with col_prev:
+        if st.button("◀ Previous", key=f"{key}_prev", disabled=page_no == 1):
+            state["cursors"].pop()
+            st.rerun()
+    with col_info:
+        st.caption(f"Page {page_no} of {page_count} ({state['total']} records)")
+    with col_next:
+        if st.button("Next ▶", key=f"{key}_next", disabled=not page["has_more"]):
+            state["cursors"].append(page["records"][-1]["Id"])
+            st.rerun()
@@ -0,0 +1,152 @@
+import os
+from datetime import date, timedelta
+
+import altair as alt
+import pandas as pd
+import streamlit as st
+
+import record_frame
+import search_cache
+
+# ------------------- PIPELINE DASHBOARD -------------------
+# Opportunity pipeline charts from a single aggregate query, grouped by
+# stage, forecast category and close month. Salesforce does the counting
+# and summing, so the app receives a few hundred group rows instead of
+# every Opportunity, and the charts regroup those rows locally. The
+# result goes through search_cache with DASHBOARD_TTL, under the spec's
+# own "dashboard_cache" name rather than the Opportunity searches: reruns
+# reuse it, and object_engine clears it on every save, delete and bulk
+# load of Opportunities in the app.
+
+DASHBOARD_TTL = int(os.environ.get("SFDC_DASHBOARD_TTL", "600"))
+# An aggregate query returns at most 2,000 groups; this keeps stages x months well below that
+MAX_MONTHS = 60
+DEFAULT_MONTHS_BACK = 12
+DEFAULT_MONTHS_AHEAD = 12
+CLOSED_CATEGORIES = ("Closed", "Omitted")   # forecast categories of won and lost deals
+_COLUMNS = ["StageName", "ForecastCategoryName", "close_year", "close_month", "deals", "amount",
+            "expected", "probability", "with_probability"]
+
+
+def _month_start(day, months):
+    """First day of the month `months` after (or before, if negative) the month of `day`"""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def default_range(today):
+    """DEFAULT_MONTHS_BACK whole months before this month through DEFAULT_MONTHS_AHEAD after it"""
+    return _month_start(today, -DEFAULT_MONTHS_BACK), _month_start(today, DEFAULT_MONTHS_AHEAD + 1) - timedelta(days=1)
+
+
+def pipeline_query(start, end):
+    """Aggregate SOQL of the Opportunities closing between `start` and `end` (dates, inclusive)"""
+    return ("SELECT StageName, ForecastCategoryName, CALENDAR_YEAR(CloseDate) close_year, "
+            "CALENDAR_MONTH(CloseDate) close_month, COUNT(Id) deals, SUM(Amount) amount, "
+            "SUM(ExpectedRevenue) expected, AVG(Probability) probability, COUNT(Probability) with_probability "
+            f"FROM Opportunity WHERE CloseDate >= {start.isoformat()} AND CloseDate <= {end.isoformat()} "
+            "GROUP BY StageName, ForecastCategoryName, CALENDAR_YEAR(CloseDate), CALENDAR_MONTH(CloseDate)")
+
+
+def fetch(sf, start, end):
+    """AggregateResult records of pipeline_query(), as a search page"""
+    return {"records": sf.query(pipeline_query(start, end))["records"]}
+
+
+def to_frame(records, spec):
+    """One row per (stage, forecast category, close month) group; picklists are categoricals in
+    picklist order"""
+    frame = record_frame.to_frame(records, _COLUMNS, spec)
+    for column in _COLUMNS[4:]:
+        frame[column] = pd.to_numeric(frame[column], errors="coerce").fillna(0)
+    frame["month"] = pd.to_datetime({"year": frame["close_year"], "month": frame["close_month"], "day": 1})
+    return frame
+
+
+def pipeline(sf, spec, start, end):
+    """Cached pipeline groups (see to_frame()); every Opportunity write the app makes clears them"""
+    page = search_cache.cached_search(search_cache.scope_for(sf), spec["dashboard_cache"], "",
+                                      lambda _: fetch(sf, start, end), ttl=DASHBOARD_TTL,
+                                      page=("pipeline", start, end))
+    return to_frame(page["records"], spec)
+
+
+def by_stage(frame):
+    """Deals, amount, expected revenue and average probability per stage"""
+    grouped = frame.assign(probability_sum=frame["probability"] * frame["with_probability"]).groupby(
+        "StageName", observed=True)[["deals", "amount", "expected", "probability_sum", "with_probability"]].sum()
+    grouped["probability"] = grouped["probability_sum"] / grouped["with_probability"].where(
+        grouped["with_probability"] > 0)
+    return grouped.drop(columns=["probability_sum", "with_probability"])
+
+
+def _metrics(frame):
+    open_deals = frame[~frame["ForecastCategoryName"].isin(CLOSED_CATEGORIES)]
+    won = frame[frame["ForecastCategoryName"] == "Closed"]
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Open pipeline", f"{open_deals['amount'].sum():,.0f}", f"{int(open_deals['deals'].sum()):,} deals",
+                delta_color="off")
+    col2.metric("Expected revenue", f"{open_deals['expected'].sum():,.0f}")
+    col3.metric("Closed won", f"{won['amount'].sum():,.0f}", f"{int(won['deals'].sum()):,} deals",
+                delta_color="off")
+    col4.metric("Deals in range", f"{int(frame['deals'].sum()):,}")
+
+
+def _charts(frame):
+    stages = list(frame["StageName"].cat.categories)
+    monthly = frame.groupby(["month", "StageName"], observed=True, as_index=False)[["amount", "deals"]].sum()
+    monthly["stage_order"] = monthly["StageName"].cat.codes
+    st.altair_chart(alt.Chart(monthly).mark_bar().encode(
+        x=alt.X("yearmonth(month):T", title="Close month"),
+        y=alt.Y("amount:Q", title="Amount"),
+        color=alt.Color("StageName:N", title="Stage", scale=alt.Scale(domain=stages)),
+        order=alt.Order("stage_order:Q"),
+        tooltip=[alt.Tooltip("yearmonth(month):T", title="Month"), alt.Tooltip("StageName:N", title="Stage"),
+                 alt.Tooltip("deals:Q", title="Deals"), alt.Tooltip("amount:Q", title="Amount", format=",.0f")],
+    ), use_container_width=True)
+
+    col_forecast, col_stage = st.columns(2)
+    forecast = frame.groupby("ForecastCategoryName", observed=True, as_index=False)[["amount", "deals"]].sum()
+    with col_forecast:
+        st.markdown("**By forecast category**")
+        st.altair_chart(alt.Chart(forecast).mark_bar().encode(
+            x=alt.X("amount:Q", title="Amount"),
+            y=alt.Y("ForecastCategoryName:N", title=None,
+                    sort=list(frame["ForecastCategoryName"].cat.categories)),
+            tooltip=[alt.Tooltip("deals:Q", title="Deals"), alt.Tooltip("amount:Q", title="Amount", format=",.0f")],
+        ), use_container_width=True)
+    with col_stage:
+        st.markdown("**By stage**")
+        table = by_stage(frame).reset_index()
+        table.columns = ["Stage", "Deals", "Amount", "Expected Revenue", "Avg Probability %"]
+        st.dataframe(table.round({"Amount": 0, "Expected Revenue": 0, "Avg Probability %": 1}),
+                     use_container_width=True, hide_index=True)
+
+
+def render(sf, spec):
+    """Pipeline dashboard tab of the Opportunity page"""
+    st.markdown(f"<h4 style='color: {spec['color']};'>📊 Pipeline Dashboard</h4>", unsafe_allow_html=True)
+    first, last = default_range(date.today())
+    col_from, col_to = st.columns(2)
+    with col_from:
+        start = st.date_input("Closing from", value=first, key="pipeline_start")
+    with col_to:
+        end = st.date_input("Closing to", value=last, key="pipeline_end")
+    if end < start:
+        st.warning("⚠️ The end date is before the start date.")
+        return
+    if (end.year - start.year) * 12 + end.month - start.month >= MAX_MONTHS:
+        st.warning(f"⚠️ Pick a range of at most {MAX_MONTHS} months.")
+        return
+
+    try:
+        frame = pipeline(sf, spec, start, end)
+    except Exception as e:
+        st.error(f"❌ Salesforce Query Error: {e}")
+        return
+    if frame.empty:
+        st.info("No Opportunities close in this range.")
+        return
+    _metrics(frame)
+    _charts(frame)
+    st.caption(f"Aggregated by Salesforce: {len(frame)} groups, cached for {DASHBOARD_TTL // 60} minutes.")
@@ -0,0 +1,44 @@
+import pandas as pd
+
+# ------------------- QUERY RESULT FRAMES -------------------
+# One decoder from query records (the JSON dicts simple_salesforce
+# returns) to a DataFrame. It is built column by column, so the
+# "attributes" of each record are never copied and no column is inferred
+# from the keys of every row. A relationship field such as "Account.Name"
+# is read from its parent records in one pass per level. Given a spec,
+# picklists become categoricals (one small integer code per row instead
+# of a string object) and number fields numeric columns.
+
+_NUMERIC_TYPES = ("number", "int")
+
+
+def column_values(records, field):
+    """Values of one field across records; "Account.Name" reads the nested parent record"""
+    if "." not in field:
+        return [r.get(field) for r in records]
+    relation, rest = field.split(".", 1)
+    return column_values([r.get(relation) or {} for r in records], rest)
+
+
+def picklist(values, options=()):
+    """Categorical of picklist values; categories are `options` in order, then any other value found
+    (e.g. one since deactivated)"""
+    known = set(options)
+    extra = [v for v in dict.fromkeys(values) if v is not None and v not in known]
+    return pd.Categorical(values, categories=list(options) + extra)
+
+
+def to_frame(records, fields, spec=None):
+    """DataFrame of query records with one column per name in `fields` (in that order)"""
+    records = records if isinstance(records, list) else list(records)
+    types = {f["name"]: f for f in spec["fields"]} if spec else {}
+    columns = {}
+    for name in fields:
+        values = column_values(records, name)
+        field = types.get(name)
+        if field and field["type"] == "picklist":
+            values = picklist(values, field.get("options") or ())
+        elif field and field["type"] in _NUMERIC_TYPES:
+            values = pd.to_numeric(pd.Series(values, dtype=object), errors="coerce")
+        columns[name] = values
+    return pd.DataFrame(columns, index=pd.RangeIndex(len(records)))
@@ -0,0 +1,141 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+# ------------------- SEARCH RESULT CACHE -------------------
+# Process-wide LRU cache of search results with a TTL, keyed on
+# (connection scope, object, normalized search term). Streamlit reruns the
+# whole script on every widget interaction, so without this each rerun
+# repeats the same SOQL query. Writes to an object invalidate only its
+# entries they can affect: entries holding the written record, and entries
+# whose term the record's new values would now match. Global searches
+# (SOSL over all fields, not just the object's search fields) can match a
+# record on any field, so every write drops all of them.
+#
+# Misses are single-flight: the query runs on a small shared pool, and
+# every caller asking for the same key while it is in flight waits for
+# that one call instead of sending its own. A waiter can give up between
+# WAIT_SLICE waits (Streamlit stops a stale script run there when a newer
+# term arrives); the query still finishes and fills the cache.
+
+DEFAULT_TTL = int(os.environ.get("SFDC_SEARCH_CACHE_TTL", "300"))
+MAX_ENTRIES = int(os.environ.get("SFDC_SEARCH_CACHE_SIZE", "256"))
+# Object name of global (all-object) searches; a write to any object drops them all
+ALL_OBJECTS = "*"
+WORKERS = int(os.environ.get("SFDC_SEARCH_WORKERS", "8"))
+WAIT_SLICE = 0.1             # seconds between on_wait() calls while a query is in flight
+
+_lock = threading.Lock()
+_entries = OrderedDict()   # (scope, object, term, page) -> (expires_at, record ids, results)
+_flights = {}              # same key -> Future of the query in flight
+_generations = {}          # scope -> writes seen; a query that raced a write is not cached
+_executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="search")
+_stats = {"hits": 0, "misses": 0, "coalesced": 0, "abandoned": 0, "evictions": 0, "invalidations": 0}
+
+
+def normalize_term(term):
+    """Search terms are matched with LIKE, which is case-insensitive"""
+    return (term or "").strip().lower()
+
+
+def scope_for(sf):
+    """Cache scope of a connection: results differ per org and per user's sharing rules"""
+    return (sf.sf_instance, id(sf))
+
+
+def _record_ids(results):
+    records = results.get("records", []) if isinstance(results, dict) else results
+    return {r.get("Id") for r in records}
+
+
+def _fly(key, fetch, ttl):
+    """Run one query for `key` and cache its results unless a write to the object happened meanwhile"""
+    with _lock:
+        generation = _generations.get(key[0], 0)
+    try:
+        results = fetch(key[2])
+        ids = _record_ids(results)
+        with _lock:
+            if _generations.get(key[0], 0) == generation:
+                _entries[key] = (time.monotonic() + (DEFAULT_TTL if ttl is None else ttl), ids, results)
+                _entries.move_to_end(key)
+                while len(_entries) > MAX_ENTRIES:
+                    _entries.popitem(last=False)
+                    _stats["evictions"] += 1
+        return results
+    finally:
+        with _lock:
+            _flights.pop(key, None)
+
+
+def cached_search(scope, object_name, term, fetch, ttl=None, page=None, on_wait=None):
+    """Return cached results for `term` (and `page`), calling `fetch(normalized_term)` on a miss or expiry.
+
+    A miss joins the query already in flight for the same key, if any.
+    `on_wait()` is called every WAIT_SLICE seconds while waiting; an
+    exception it raises abandons the wait (the query still completes).
+    """
+    key = (scope, object_name, normalize_term(term), page)
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(key)
+        if entry and entry[0] > now:
+            _entries.move_to_end(key)
+            _stats["hits"] += 1
+            return entry[2]
+        flight = _flights.get(key)
+        if flight is None:
+            _stats["misses"] += 1
+            flight = _flights[key] = _executor.submit(_fly, key, fetch, ttl)
+        else:
+            _stats["coalesced"] += 1
+
+    while True:
+        try:
+            return flight.result(timeout=WAIT_SLICE if on_wait else None)
+        except TimeoutError:
+            try:
+                on_wait()
+            except BaseException:
+                with _lock:
+                    _stats["abandoned"] += 1
+                raise
+
+
+def invalidate(scope, object_name, record_id=None, texts=()):
+    """Drop every page of the object's terms that contain `record_id` or are a substring of any of
+    `texts`, and every global search"""
+    texts = [t.lower() for t in texts if isinstance(t, str) and t]
+    with _lock:
+        _generations[scope] = _generations.get(scope, 0) + 1
+        keys = [k for k in _entries if k[0] == scope and k[1] == object_name]
+        # Any change shifts page totals, so all pages of an affected term go together
+        stale_terms = {
+            k[2] for k in keys
+            if (record_id and record_id in _entries[k][1]) or any(k[2] in t for t in texts)
+        }
+        for key in keys + [k for k in _entries if k[0] == scope and k[1] == ALL_OBJECTS]:
+            if key[1] == ALL_OBJECTS or key[2] in stale_terms:
+                del _entries[key]
+                _stats["invalidations"] += 1
+
+
+def clear(scope, object_name):
+    """Drop every entry for one object (and every global search), e.g. after a bulk load"""
+    with _lock:
+        _generations[scope] = _generations.get(scope, 0) + 1
+        for key in [k for k in _entries if k[0] == scope and k[1] in (object_name, ALL_OBJECTS)]:
+            del _entries[key]
+            _stats["invalidations"] += 1
+
+
+def cache_stats():
+    """Hit/miss/coalesced/abandoned counters plus the current number of cached searches"""
+    with _lock:
+        stats = dict(_stats)
+        stats["entries"] = len(_entries)
+    lookups = stats["hits"] + stats["misses"] + stats["coalesced"]
+    stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+    return stats
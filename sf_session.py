@@ -0,0 +1,214 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+from functools import partial
+
+import requests
+from cryptography.fernet import Fernet, InvalidToken
+from requests.adapters import HTTPAdapter
+from simple_salesforce import Salesforce, SalesforceLogin
+from urllib3.util.retry import Retry
+
+import local_store
+
+# ------------------- SALESFORCE SESSION POOL -------------------
+# One authenticated Salesforce connection per user/org for the whole
+# process, all sharing a single keep-alive HTTP connection pool.
+# An expired session is renewed on the first 401. With
+# SFDC_PERSIST_SESSIONS=1 session IDs are also written to disk so a server
+# restart does not force a fresh SOAP login. A session ID works as a
+# password to the org, so it is stored encrypted with a key derived from
+# the user's password and security token, which is never written anywhere.
+
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 50
+SESSIONS_FILE = "sessions.json"
+PERSIST_SESSIONS = os.environ.get("SFDC_PERSIST_SESSIONS", "0") == "1"
+PBKDF2_ROUNDS = 50000
+
+_lock = threading.Lock()
+_disk_lock = threading.Lock()
+_sessions = {}        # (username, domain) -> {"sf", "check", "lock", "credentials"}
+_token_owner = {}     # session id -> (username, domain)
+_stats = {"hits": 0, "restored": 0, "logins": 0, "refreshes": 0}
+_memory_salt = secrets.token_bytes(16)
+
+
+def _is_invalid_session(response):
+    try:
+        body = response.json()
+    except ValueError:
+        return "InvalidSessionId" in response.text or "INVALID_SESSION_ID" in response.text
+    if isinstance(body, list) and body:
+        return body[0].get("errorCode") == "INVALID_SESSION_ID"
+    if isinstance(body, dict):
+        return body.get("exceptionCode") == "InvalidSessionId" or body.get("errorCode") == "INVALID_SESSION_ID"
+    return False
+
+
+def _token_from_headers(headers):
+    auth = headers.get("Authorization", "")
+    if auth.startswith("Bearer "):
+        return auth[len("Bearer "):]
+    return headers.get("X-SFDC-Session")
+
+
+def _with_token(headers, token):
+    headers = dict(headers)
+    if "Authorization" in headers:
+        headers["Authorization"] = "Bearer " + token
+    if "X-SFDC-Session" in headers:
+        headers["X-SFDC-Session"] = token
+    return headers
+
+
+class _RefreshingSession(requests.Session):
+    """Shared HTTP session that renews an expired Salesforce session ID and replays the request once"""
+
+    def request(self, method, url, *args, **kwargs):
+        response = super().request(method, url, *args, **kwargs)
+        if response.status_code == 401 and _is_invalid_session(response):
+            headers = kwargs.get("headers") or {}
+            new_token = _renew(_token_from_headers(headers))
+            if new_token:
+                kwargs["headers"] = _with_token(headers, new_token)
+                response = super().request(method, url, *args, **kwargs)
+        return response
+
+
+def _build_http_session():
+    session = _RefreshingSession()
+    retries = Retry(total=3, backoff_factor=0.5, status_forcelist=(502, 503, 504),
+                    allowed_methods=frozenset(["GET"]))
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=retries)
+    session.mount("https://", adapter)
+    return session
+
+
+_http = _build_http_session()
+
+
+def _memory_check(password, security_token):
+    return hashlib.sha256(_memory_salt + f"{password}\0{security_token}".encode()).hexdigest()
+
+
+def _disk_cipher(password, security_token, salt):
+    """Cipher of a saved session ID; only the same password and token give the same key"""
+    key = hashlib.pbkdf2_hmac("sha256", f"{password}\0{security_token}".encode(), bytes.fromhex(salt), PBKDF2_ROUNDS)
+    return Fernet(base64.urlsafe_b64encode(key))
+
+
+def _read_disk():
+    if not PERSIST_SESSIONS:
+        return {}
+    try:
+        with open(local_store.store_path(SESSIONS_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_disk(key, sf, password, security_token):
+    if not PERSIST_SESSIONS:
+        return
+    salt = secrets.token_hex(16)
+    saved = {
+        "salt": salt,
+        "session": _disk_cipher(password, security_token, salt).encrypt(sf.session_id.encode()).decode(),
+        "instance": sf.sf_instance,
+        "version": sf.sf_version,
+    }
+    with _disk_lock:
+        # Entries written in plain text by older versions are dropped
+        stored = {k: v for k, v in _read_disk().items() if "session_id" not in v}
+        stored["|".join(key)] = saved
+        path = local_store.store_path(SESSIONS_FILE)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(stored, f)
+
+
+def _login_partial(username, password, security_token, domain, sf_version):
+    return partial(SalesforceLogin, session=_http, username=username, password=password,
+                   security_token=security_token, sf_version=sf_version, domain=domain)
+
+
+def _restore(key, username, password, security_token, domain):
+    """Rebuild a connection from a session ID saved by an earlier server process"""
+    saved = _read_disk().get("|".join(key))
+    if not saved or "session" not in saved:
+        return None
+    try:
+        session_id = _disk_cipher(password, security_token, saved["salt"]).decrypt(saved["session"].encode()).decode()
+    except InvalidToken:
+        return None
+    sf = Salesforce(session_id=session_id, instance=saved["instance"],
+                    version=saved["version"], session=_http, domain=domain)
+    # Give the restored connection the credentials it needs to log in again on expiry
+    sf._salesforce_login_partial = _login_partial(username, password, security_token, domain, sf.sf_version)
+    return sf
+
+
+def _renew(token):
+    """Return a valid session ID to replace `token`, logging in again if nobody has yet"""
+    with _lock:
+        key = _token_owner.get(token)
+        entry = _sessions.get(key)
+    if entry is None:
+        return None
+    sf = entry["sf"]
+    with entry["lock"]:
+        if sf.session_id == token:
+            sf._refresh_session()
+            with _lock:
+                _stats["refreshes"] += 1
+                _token_owner[sf.session_id] = key
+            _write_disk(key, sf, *entry["credentials"])
+    return sf.session_id
+
+
+def get_connection(username, password, security_token, domain="login"):
+    """Return a pooled Salesforce connection, logging in only when no valid session is cached"""
+    key = (username.strip().lower(), domain)
+    check = _memory_check(password, security_token)
+
+    with _lock:
+        entry = _sessions.get(key)
+        if entry and hmac.compare_digest(entry["check"], check):
+            _stats["hits"] += 1
+            return entry["sf"]
+
+    sf = _restore(key, username, password, security_token, domain)
+    if sf is not None:
+        stat = "restored"
+    else:
+        sf = Salesforce(username=username, password=password, security_token=security_token,
+                        domain=domain, session=_http)
+        stat = "logins"
+        _write_disk(key, sf, password, security_token)
+
+    with _lock:
+        _sessions[key] = {"sf": sf, "check": check, "lock": threading.Lock(),
+                          "credentials": (password, security_token)}
+        _token_owner[sf.session_id] = key
+        _stats[stat] += 1
+    return sf
+
+
+def username_of(sf):
+    """Login username of a pooled connection ("" for one not made by get_connection)"""
+    with _lock:
+        return next((key[0] for key, entry in _sessions.items() if entry["sf"] is sf), "")
+
+
+def pool_stats():
+    """Counters for the session pool, including the share of logins served without a SOAP call"""
+    with _lock:
+        stats = dict(_stats)
+    requests_total = stats["hits"] + stats["restored"] + stats["logins"]
+    stats["hit_rate"] = (stats["hits"] + stats["restored"]) / requests_total if requests_total else 0.0
+    return stats
@@ -0,0 +1,64 @@
+import pandas as pd
+
+import dedup
+
+COLUMNS = ["FirstName", "LastName", "Email"]
+
+# Contacts already in Salesforce: blanks come back as None
+EXISTING = [
+    {"FirstName": "Ada", "LastName": "Lovelace", "Email": "ada@example.com"},
+    {"FirstName": " GRACE ", "LastName": "Hopper", "Email": None},
+    {"FirstName": None, "LastName": "Turing", "Email": "alan@example.com"},
+    {"FirstName": "", "LastName": "", "Email": ""},
+    {"FirstName": "Édith", "LastName": "Piaf", "Email": "Edith@Example.com "},
+]
+
+# Uploaded rows: blank cells, surrounding whitespace and mixed case
+UPLOAD = pd.DataFrame({
+    "FirstName": ["ada", "Grace", None, "  ", "ÉDITH", "Ada", "Linus", ""],
+    "LastName": ["LOVELACE ", "hopper", "Turing", None, " piaf", "Lovelace", "Torvalds", ""],
+    "Email": ["  Ada@Example.COM", "", "ALAN@example.com", "", "edith@example.com", "ada@example.org",
+              None, None],
+})
+
+
+def _old_key(r):
+    """Row-wise key as the Contact page built it before keys were hashed"""
+    fname = (r.get("FirstName") or "").strip().lower()
+    lname = (r.get("LastName") or "").strip().lower()
+    email = (r.get("Email") or "").strip().lower()
+    return f"{fname}|{lname}|{email}"
+
+
+def _old_mask(records, df):
+    existing_keys = {_old_key(r) for r in records}
+    rows = df.astype(object).where(df.notna(), None).to_dict("records")
+    return pd.Series([_old_key(r) for r in rows], index=df.index).isin(existing_keys).to_numpy()
+
+
+def _new_mask(records, df):
+    existing = dedup.existing_key_hashes(iter(records), COLUMNS)
+    return dedup.is_existing(dedup.hash_keys(dedup.build_keys(df, COLUMNS)), existing)
+
+
+def test_vectorized_keys_match_row_wise_keys():
+    keys = dedup.build_keys(UPLOAD, COLUMNS)
+    rows = UPLOAD.astype(object).where(UPLOAD.notna(), None).to_dict("records")
+    assert keys.tolist() == [_old_key(r) for r in rows]
+
+
+def test_is_existing_matches_row_wise_check():
+    old = _old_mask(EXISTING, UPLOAD)
+    new = _new_mask(EXISTING, UPLOAD)
+    assert new.tolist() == old.tolist()
+    assert new.tolist() == [True, True, True, True, True, False, False, True]
+
+
+def test_is_existing_across_pages(monkeypatch):
+    monkeypatch.setattr(dedup, "PAGE_ROWS", 2)
+    assert _new_mask(EXISTING, UPLOAD).tolist() == _old_mask(EXISTING, UPLOAD).tolist()
+
+
+def test_is_existing_with_no_records():
+    assert not _new_mask([], UPLOAD).any()
+    assert not _old_mask([], UPLOAD).any()
@@ -0,0 +1,29 @@
+import json
+import threading
+
+# ------------------- UPDATE STATS -------------------
+# Counters of the changed-fields-only record updates (see
+# object_engine.save_record). Kept apart from object_engine, so the
+# sidebar can show them without importing it and everything it needs.
+
+_lock = threading.Lock()
+_stats = {"updates": 0, "skipped": 0, "fields_sent": 0, "fields_unchanged": 0, "bytes_saved": 0}
+
+
+def _payload_bytes(data):
+    return len(json.dumps(data, default=str))
+
+
+def count_update(full, sent):
+    """Record one update: `full` is the payload of every form field, `sent` the changed ones (empty = no call)"""
+    with _lock:
+        _stats["updates" if sent else "skipped"] += 1
+        _stats["fields_sent"] += len(sent)
+        _stats["fields_unchanged"] += len(full) - len(sent)
+        _stats["bytes_saved"] += _payload_bytes(full) - (_payload_bytes(sent) if sent else 0)
+
+
+def update_stats():
+    """Update counters: calls made and skipped (nothing changed), fields sent and left out, bytes not sent"""
+    with _lock:
+        return dict(_stats)
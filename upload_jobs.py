@@ -0,0 +1,99 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# ------------------- BACKGROUND UPLOAD JOBS -------------------
+# Bulk uploads run on a process-wide executor instead of the Streamlit
+# script thread, so a rerun, a widget click or a browser refresh does not
+# abandon them halfway. Jobs are kept per owner (org + user): a session
+# re-attaches to its jobs by listing them, and the page polls their
+# progress while they run.
+
+WORKERS = int(os.environ.get("SFDC_UPLOAD_JOBS", "2"))
+# Finished jobs kept per owner for display
+KEEP_FINISHED = 10
+
+_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="upload-job")
+_jobs = {}   # job id -> job dict
+
+
+def snapshot(file):
+    """Copy an uploaded file to a temp file the job can read after the upload widget changes.
+
+    The copy keeps the original extension (file_reader picks CSV vs XLSX by
+    name) and is removed when the job finishes.
+    """
+    file.seek(0)
+    copy = tempfile.NamedTemporaryFile(suffix=os.path.splitext(file.name)[1].lower(), delete=False)
+    with copy:
+        shutil.copyfileobj(file, copy)
+    return copy.name
+
+
+def _prune(owner):
+    finished = sorted((j for j in _jobs.values() if j["owner"] == owner and j["finished"]),
+                      key=lambda j: j["finished"], reverse=True)
+    for job in finished[KEEP_FINISHED:]:
+        del _jobs[job["id"]]
+
+
+def _run(job_id, work, path):
+    def on_progress(totals):
+        with _lock:
+            _jobs[job_id]["progress"] = dict(totals)
+
+    with _lock:
+        _jobs[job_id].update(state="running", started=time.time())
+    try:
+        with open(path, "rb") as f:
+            result, error = work(f, on_progress), None
+    except Exception as e:
+        result, error = None, str(e)
+    finally:
+        os.remove(path)
+    with _lock:
+        _jobs[job_id].update(state="failed" if error else "done", result=result, error=error,
+                             finished=time.time())
+        _prune(_jobs[job_id]["owner"])
+
+
+def submit(owner, object_name, file, total, work, ref=None):
+    """Start `work(file, on_progress)` in the background for an uploaded file; returns the job id.
+
+    `work` gets a binary file object with the same name extension as the upload.
+    `ref` is kept on the job so callers can find the job of a given upload.
+    """
+    path = snapshot(file)
+    job_id = uuid.uuid4().hex[:12]
+    with _lock:
+        _jobs[job_id] = {"id": job_id, "owner": owner, "object": object_name, "file": file.name, "ref": ref,
+                         "total": total, "state": "queued", "progress": {}, "result": None, "error": None,
+                         "submitted": time.time(), "started": None, "finished": None}
+    _executor.submit(_run, job_id, work, path)
+    return job_id
+
+
+def jobs_for(owner, object_name=None):
+    """Copies of an owner's jobs (optionally for one object), newest first"""
+    with _lock:
+        jobs = [dict(j) for j in _jobs.values()
+                if j["owner"] == owner and object_name in (None, j["object"])]
+    return sorted(jobs, key=lambda j: j["submitted"], reverse=True)
+
+
+def dismiss(owner, job_id):
+    """Forget a finished job"""
+    with _lock:
+        job = _jobs.get(job_id)
+        if job and job["owner"] == owner and job["finished"]:
+            del _jobs[job_id]
+
+
+def running_count(owner):
+    with _lock:
+        return sum(1 for j in _jobs.values() if j["owner"] == owner and not j["finished"])
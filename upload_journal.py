@@ -0,0 +1,147 @@
+import hashlib
+import sqlite3
+from datetime import datetime, timezone
+
+import pandas as pd
+
+import local_store
+
+# ------------------- UPLOAD JOURNAL -------------------
+# Every bulk upload is journaled per row in a local SQLite file, keyed on
+# (file content hash, object). The duplicate check of the whole file is
+# recorded before anything is sent, so uploading the same file again
+# resumes where it stopped: rows already inserted, failed or skipped are
+# not sent again and existing keys are not re-fetched.
+#
+# Row status: "skipped" (duplicate), "new" (to send), "pending" (handed to
+# an insert whose result was not recorded), "ok" (created), "updated" (by
+# an upsert), "failed", "submitted" (in a Bulk API 2.0 job whose results
+# are not in yet; record_id holds the job id). Once a job's results are
+# downloaded its rows get the status, Id and error Salesforce reported.
+
+JOURNAL_FILE = "upload_journal.sqlite3"
+STATUS_LABELS = {"skipped": "Duplicate (skipped)", "new": "Not sent", "pending": "Not confirmed",
+                 "ok": "Inserted", "updated": "Updated", "failed": "Failed",
+                 "submitted": "Sent in Bulk API 2.0 job"}
+
+
+def file_hash(file):
+    """SHA-256 of an uploaded file's content"""
+    digest = hashlib.sha256()
+    file.seek(0)
+    for block in iter(lambda: file.read(1024 * 1024), b""):
+        digest.update(block)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def connect(sf):
+    conn = sqlite3.connect(local_store.org_path(sf, JOURNAL_FILE), timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # A commit per batch result; WAL with NORMAL sync keeps that cheap and survives a process crash
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS uploads (file_hash TEXT, object TEXT, file_name TEXT, total INTEGER, "
+                 "planned INTEGER DEFAULT 0, started TEXT, finished TEXT, PRIMARY KEY (file_hash, object))")
+    conn.execute("CREATE TABLE IF NOT EXISTS rows (file_hash TEXT, object TEXT, row INTEGER, status TEXT, "
+                 "record_id TEXT, error TEXT, PRIMARY KEY (file_hash, object, row)) WITHOUT ROWID")
+    return conn
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def status(conn, key):
+    """What is known about an upload: file name, total rows, planned/finished flags and row counts by
+    status (None if the file was never uploaded for this object)"""
+    row = conn.execute("SELECT file_name, total, planned, started, finished FROM uploads "
+                       "WHERE file_hash = ? AND object = ?", key).fetchone()
+    if row is None:
+        return None
+    counts = dict(conn.execute("SELECT status, COUNT(*) FROM rows WHERE file_hash = ? AND object = ? "
+                               "GROUP BY status", key).fetchall())
+    return {"file_name": row[0], "total": row[1], "planned": bool(row[2]), "started": row[3],
+            "finished": row[4], "counts": {s: counts.get(s, 0) for s in STATUS_LABELS}}
+
+
+def start(conn, key, file_name):
+    with conn:
+        conn.execute("INSERT OR IGNORE INTO uploads (file_hash, object, file_name, started) VALUES (?, ?, ?, ?)",
+                     key + (file_name, _now()))
+
+
+def plan(conn, key, rows, statuses):
+    """Record the duplicate check of one chunk (rows already journaled keep their status)"""
+    with conn:
+        conn.executemany("INSERT OR IGNORE INTO rows (file_hash, object, row, status) VALUES (?, ?, ?, ?)",
+                         [key + (int(r), s) for r, s in zip(rows, statuses)])
+
+
+def finish_plan(conn, key, total):
+    with conn:
+        conn.execute("UPDATE uploads SET planned = 1, total = ? WHERE file_hash = ? AND object = ?",
+                     (total,) + key)
+
+
+def rows_with_status(conn, key, statuses, first, last):
+    """Row numbers between `first` and `last` (inclusive) whose status is one of `statuses`"""
+    marks = ", ".join("?" * len(statuses))
+    return [r for (r,) in conn.execute(
+        f"SELECT row FROM rows WHERE file_hash = ? AND object = ? AND row BETWEEN ? AND ? AND status IN ({marks})",
+        key + (int(first), int(last)) + tuple(statuses))]
+
+
+def unconfirm_submitted(conn, key):
+    """Rows of Bulk API 2.0 jobs whose results an earlier run never recorded are pending again"""
+    with conn:
+        conn.execute("UPDATE rows SET status = 'pending', record_id = NULL "
+                     "WHERE file_hash = ? AND object = ? AND status = 'submitted'", key)
+
+
+def reset_pending(conn, key):
+    """Queue unconfirmed rows to be sent again (safe for upserts, which match on their External ID)"""
+    with conn:
+        conn.execute("UPDATE rows SET status = 'new' WHERE file_hash = ? AND object = ? AND status = 'pending'", key)
+
+
+def record(conn, key, entries):
+    """Store (row, status, record id, error) outcomes in one transaction"""
+    with conn:
+        conn.executemany("INSERT OR REPLACE INTO rows (file_hash, object, row, status, record_id, error) "
+                         "VALUES (?, ?, ?, ?, ?, ?)", [key + (int(r), s, i, e) for r, s, i, e in entries])
+
+
+def finish(conn, key):
+    """Mark the upload finished once no row is left to send or confirm"""
+    left = conn.execute("SELECT COUNT(*) FROM rows WHERE file_hash = ? AND object = ? "
+                        "AND status IN ('new', 'pending', 'submitted')", key).fetchone()[0]
+    if left == 0:
+        with conn:
+            conn.execute("UPDATE uploads SET finished = ? WHERE file_hash = ? AND object = ?", (_now(),) + key)
+    return left == 0
+
+
+def forget(conn, key):
+    """Drop the journal of an upload so the file is processed from scratch"""
+    with conn:
+        conn.execute("DELETE FROM rows WHERE file_hash = ? AND object = ?", key)
+        conn.execute("DELETE FROM uploads WHERE file_hash = ? AND object = ?", key)
+
+
+def outcome_path(sf, key):
+    return local_store.org_path(sf, f"outcome_{key[1]}_{key[0][:16]}.csv")
+
+
+def write_outcomes(sf, conn, key, chunks):
+    """Write the uploaded rows with their Upload Status, Id and Error to a CSV file; returns its path"""
+    path = outcome_path(sf, key)
+    header = True
+    for chunk in chunks:
+        outcomes = pd.read_sql_query(
+            "SELECT row, status AS \"Upload Status\", record_id AS \"Upload Id\", error AS \"Upload Error\" FROM rows "
+            "WHERE file_hash = ? AND object = ? AND row BETWEEN ? AND ?", conn,
+            params=key + (int(chunk.index.min()), int(chunk.index.max())), index_col="row")
+        outcomes["Upload Status"] = outcomes["Upload Status"].map(STATUS_LABELS)
+        chunk.join(outcomes).to_csv(path, mode="w" if header else "a", header=header, index=False)
+        header = False
+    return path